@@ -0,0 +1,94 @@
+import os
+import json
+import tempfile
+import time
+import tracemalloc
+parentdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.sys.path.insert(0, parentdir)
+
+from memory_per_route import generate_network, build_current
+
+def legacy_convert_to_json(graph):
+    """Convert a Graph object to a JSON object the way convert_to_json did before coordinates were kept structured:
+    coordinates are parsed back from their string and all edges are sorted at once.
+
+    Args:
+        graph: Graph object.
+
+    Returns:
+        A JSON object holding the graph info.
+    """
+    graph_json = {'metros': [], 'routes': []}
+    for key in sorted(graph.vertices):
+        metro = graph.vertices[key].to_json()
+        metro['coordinates'] = json.loads(str(metro['coordinates']).replace("\'", "\""))
+        graph_json['metros'].append(metro)
+    edges = graph._directed_edges(graph._flights())
+    for edge in sorted(edges, key=lambda edge: (edge.departure.code, edge.destination.code)):
+        graph_json['routes'].append({'ports': [edge.departure.code, edge.destination.code], 'distance': edge.distance})
+
+    return graph_json
+
+
+def dump_legacy(graph, out):
+    json.dump(legacy_convert_to_json(graph), out, sort_keys=True, indent=4, separators=(',', ': '))
+
+
+def dump_tree(graph, out):
+    json.dump(graph.convert_to_json(), out, sort_keys=True, indent=4, separators=(',', ': '))
+
+
+def dump_stream(graph, out):
+    graph.write_json(out)
+
+
+def dump_stream_unsorted(graph, out):
+    graph.write_json(out, sort=False)
+
+
+def measure(export, graph, addr):
+    """Measure time and peak memory of writing a graph to a file.
+
+    Args:
+        export: Function writing a graph to a file object.
+        graph: Graph object.
+        addr: Written file address.
+
+    Returns:
+        Seconds and peak number of bytes allocated while writing.
+    """
+    tracemalloc.start()
+    with open(addr, 'wt') as out:
+        export(graph, out)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    with open(addr, 'wt') as out:
+        export(graph, out)
+    seconds = time.perf_counter() - start
+
+    return seconds, peak
+
+
+def main(vertex_count=20000, route_count=100000):
+    """Report time and peak memory of saving a network with json.dump of convert_to_json and with write_json.
+
+    Args:
+        vertex_count: Number of metros.
+        route_count: Number of routes.
+    """
+    graph = build_current(generate_network(vertex_count, route_count))
+    with tempfile.TemporaryDirectory() as directory:
+        texts = dict()
+        for name, export in (('legacy', dump_legacy), ('tree', dump_tree), ('stream', dump_stream),
+                             ('stream unsorted', dump_stream_unsorted)):
+            addr = os.path.join(directory, name + '.json')
+            seconds, peak = measure(export, graph, addr)
+            print('%-16s %8.3f s %10.1f MB peak' % (name, seconds, peak / 1e6))
+            with open(addr) as file:
+                texts[name] = file.read()
+        print('identical output: %s' % (texts['legacy'] == texts['tree'] == texts['stream']))
+
+
+if __name__ == '__main__':
+    main()
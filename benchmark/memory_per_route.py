@@ -0,0 +1,152 @@
+import os
+import random
+import tracemalloc
+parentdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.sys.path.insert(0, parentdir)
+
+from graph.graph import Graph
+
+class LegacyVertex(object):
+    """Vertex layout before slots and integer ids: a __dict__ object holding the same attributes and adjacency dicts.
+
+    """
+    def __init__(self, metro):
+        self.name = metro['name']
+        self.population = metro['population']
+        self.country = metro['country']
+        self.region = metro['region']
+        self.code = metro['code']
+        self.continent = metro['continent']
+        self.timezone = metro['timezone']
+        self.coordinates = str(metro['coordinates'])
+        self.edges = dict()
+        self.in_edges = dict()
+
+
+class LegacyEdge(object):
+    """Edge layout before slots: a __dict__ object.
+
+    """
+    def __init__(self, departure, destination, distance):
+        self.departure = departure
+        self.destination = destination
+        self.distance = distance
+
+
+def generate_network(vertex_count, route_count, seed=242):
+    """Generate a random network JSON object in the format of json/map_data.json.
+
+    Args:
+        vertex_count: Number of metros.
+        route_count: Number of routes (each loaded as two directed edges).
+        seed: Random seed.
+
+    Returns:
+        A JSON object holding metros and routes.
+    """
+    rng = random.Random(seed)
+    codes = ['%c%c%c' % (65 + i // 676 % 26, 65 + i // 26 % 26, 65 + i % 26) for i in range(vertex_count)]
+    metros = []
+    for code in codes:
+        metros.append({'code': code, 'name': 'City ' + code, 'country': rng.choice(['US', 'FR', 'CN', 'BR']),
+                       'continent': rng.choice(['North America', 'Europe', 'Asia', 'South America']),
+                       'timezone': rng.randint(-11, 12), 'coordinates': {'N': rng.randint(0, 89), 'W': rng.randint(0, 179)},
+                       'population': rng.randint(100000, 30000000), 'region': rng.randint(1, 4)})
+    routes = []
+    seen = set()
+    while len(routes) < route_count:
+        departure, destination = rng.sample(codes, 2)
+        if (departure, destination) in seen or (destination, departure) in seen:
+            continue
+        seen.add((departure, destination))
+        routes.append({'ports': [departure, destination], 'distance': rng.randint(100, 15000)})
+
+    return {'metros': metros, 'routes': routes}
+
+
+def build_legacy(data):
+    """Build the vertices and edges of a network with the legacy layout and "DEP,DST" string edge keys.
+
+    Args:
+        data: Network JSON object.
+
+    Returns:
+        Tuple of vertices dict and edges dict.
+    """
+    vertices = dict()
+    edges = dict()
+    for city in data['metros']:
+        vertices[city['code']] = LegacyVertex(city)
+    for route in data['routes']:
+        for departure, destination in ((route['ports'][0], route['ports'][1]), (route['ports'][1], route['ports'][0])):
+            edge = LegacyEdge(vertices[departure], vertices[destination], route['distance'])
+            vertices[departure].edges[vertices[destination]] = edge
+            vertices[destination].in_edges[vertices[departure]] = edge
+            edges[departure + "," + destination] = edge
+
+    return vertices, edges
+
+
+def build_current(data):
+    """Build a Graph object from a network JSON object.
+
+    Args:
+        data: Network JSON object.
+
+    Returns:
+        Graph object.
+    """
+    graph = Graph()
+    graph.load_vertices(data)
+    graph.load_edges(data)
+
+    return graph
+
+
+def measure(build, data):
+    """Measure memory allocated by a build function.
+
+    Args:
+        build: Function building a network from a JSON object.
+        data: Network JSON object.
+
+    Returns:
+        Number of bytes still allocated after the build.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    network = build(data)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del network
+
+    return after - before
+
+
+def main(vertex_count=2000, route_count=20000):
+    """Report memory per vertex and per route of the legacy layout and the current Graph object.
+
+    Memory per route is the memory of the full network minus the memory of its vertices alone, divided by the number
+    of routes.
+
+    Args:
+        vertex_count: Number of metros.
+        route_count: Number of routes.
+    """
+    data = generate_network(vertex_count, route_count)
+    vertices_only = {'metros': data['metros'], 'routes': []}
+    per_vertex = dict()
+    per_route = dict()
+    for name, build in (('legacy', build_legacy), ('current', build_current)):
+        network_bytes = measure(build, data)
+        vertex_bytes = measure(build, vertices_only)
+        per_vertex[name] = vertex_bytes / vertex_count
+        per_route[name] = (network_bytes - vertex_bytes) / route_count
+        print('%-8s %10d bytes total, %8.1f bytes per vertex, %8.1f bytes per route' %
+              (name, network_bytes, per_vertex[name], per_route[name]))
+    print('memory per vertex reduced by %.1f%%' % (100 * (1 - per_vertex['current'] / per_vertex['legacy'])))
+    print('memory per route reduced by %.1f%%' % (100 * (1 - per_route['current'] / per_route['legacy'])))
+
+
+if __name__ == '__main__':
+    main()
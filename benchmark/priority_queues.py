@@ -0,0 +1,97 @@
+import os
+import random
+import timeit
+parentdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.sys.path.insert(0, parentdir)
+
+from graph.graph import Graph
+from graph.priority_queue import PriorityQueue
+from graph.radix_heap import RadixHeap
+from memory_per_route import generate_network
+
+QUEUES = (('PriorityQueue', PriorityQueue), ('RadixHeap', RadixHeap))
+
+def build_graph(vertex_count, route_count):
+    """Build a Graph object from a random network.
+
+    Args:
+        vertex_count: Number of metros.
+        route_count: Number of routes.
+
+    Returns:
+        Graph object.
+    """
+    data = generate_network(vertex_count, route_count)
+    graph = Graph()
+    graph.load_vertices(data)
+    graph.load_edges(data)
+
+    return graph
+
+
+def run_searches(graph, pairs, queue, method):
+    """Run shortest path searches with a priority queue class.
+
+    Args:
+        graph: Graph object.
+        pairs: List of (departure code, destination code) pairs.
+        queue: Priority queue class.
+        method: 'dijkstra' or 'bidirectional'.
+
+    Returns:
+        List of shortest paths.
+    """
+    return [graph.calculate_shortest_path(pair, method, queue) for pair in pairs]
+
+
+def run_queue(queue, priorities):
+    """Insert, decrease and pop integer vertex ids the way dijkstra's algorithm does.
+
+    Args:
+        queue: Priority queue class.
+        priorities: List of (vertex id, tentative distance) pairs, offsets from the last popped distance.
+    """
+    pq = queue()
+    last = 0
+    for vertex, offset in priorities:
+        distance = last + offset
+        if not vertex in pq or distance < pq[vertex]:
+            pq[vertex] = distance
+        if len(pq) > 64:
+            last = pq[pq.smallest()]
+            pq.pop_smallest()
+    while pq:
+        pq.pop_smallest()
+
+
+def main(vertex_count=5000, route_count=20000, query_count=200, repeat=3):
+    """Report the time of shortest path searches and of plain queue operations with PriorityQueue and RadixHeap.
+
+    Args:
+        vertex_count: Number of metros.
+        route_count: Number of routes.
+        query_count: Number of shortest path queries.
+        repeat: Number of timed runs; the fastest one is reported.
+    """
+    graph = build_graph(vertex_count, route_count)
+    rng = random.Random(242)
+    codes = sorted(graph.vertices)
+    pairs = [rng.sample(codes, 2) for i in range(query_count)]
+    priorities = [(rng.randrange(vertex_count), rng.randint(0, 15000)) for i in range(200000)]
+
+    for method in ('dijkstra', 'bidirectional'):
+        results = dict()
+        for name, queue in QUEUES:
+            results[name] = min(timeit.repeat(lambda: run_searches(graph, pairs, queue, method), number=1, repeat=repeat))
+            print('%-10s %-14s %8.3f s for %d queries' % (method, name, results[name], query_count))
+        print('%-10s speedup %.2fx' % (method, results['PriorityQueue'] / results['RadixHeap']))
+
+    results = dict()
+    for name, queue in QUEUES:
+        results[name] = min(timeit.repeat(lambda: run_queue(queue, priorities), number=1, repeat=repeat))
+        print('%-10s %-14s %8.3f s for %d updates' % ('queue', name, results[name], len(priorities)))
+    print('%-10s speedup %.2fx' % ('queue', results['PriorityQueue'] / results['RadixHeap']))
+
+
+if __name__ == '__main__':
+    main()
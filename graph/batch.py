@@ -0,0 +1,273 @@
+from .edge import Edge
+
+# keys a vertex info JSON object must hold
+VERTEX_KEYS = ('code', 'name', 'country', 'continent', 'timezone', 'coordinates', 'population', 'region')
+
+class GraphBatch(object):
+    """Graph batch object.
+
+    Transaction of changes of a Graph object, used as a context manager (with graph.batch() as batch: ...). Changes are
+    queued while the block runs and applied when it ends without an exception. Before anything is applied, all changes
+    are checked together in order, so a change may rely on an earlier one of the same batch (e.g. an edge between two
+    added vertices). If any change is invalid, nothing is applied and ValueError lists every invalid change. If applying
+    fails, the changes already applied are undone in reverse order and the exception is passed on.
+
+    Registered indexes are not notified of the single changes; they are rebuilt once after the batch, and caches keyed
+    by the graph version are refreshed on their next use. An enabled change journal records the batch as one entry.
+
+    """
+    def __init__(self, graph):
+        """Constructor of GraphBatch object.
+
+        Args:
+            graph: Graph object to be changed.
+        """
+        self.graph = graph
+        self.changes = []
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.changes = []
+        return False
+
+
+    def __len__(self):
+        return len(self.changes)
+
+
+    def add_vertex(self, vertex):
+        """Queue the addition of a vertex.
+
+        Args:
+            vertex: JSON object holding vertex info.
+        """
+        self.changes.append(('add_vertex', vertex))
+
+
+    def edit_vertex(self, vertex):
+        """Queue the edit of a vertex info.
+
+        Args:
+            vertex: JSON object holding vertex info.
+        """
+        self.changes.append(('edit_vertex', vertex))
+
+
+    def remove_vertex(self, code):
+        """Queue the removal of a vertex and its connected edges.
+
+        Args:
+            code: Code of vertex to be removed.
+        """
+        self.changes.append(('remove_vertex', code))
+
+
+    def remove_vertices(self, codes):
+        """Queue the removal of several vertices and their connected edges.
+
+        Args:
+            codes: List of code of vertices to be removed.
+        """
+        for code in codes:
+            self.remove_vertex(code)
+
+
+    def add_edge(self, departure, destination, distance):
+        """Queue the addition of an edge. An existing edge gets the new distance.
+
+        Args:
+            departure: Code of departure vertex.
+            destination: Code of destination vertex.
+            distance: Distance of the edge.
+        """
+        self.changes.append(('add_edge', departure, destination, distance))
+
+
+    def remove_edge(self, departure, destination):
+        """Queue the removal of an edge.
+
+        Args:
+            departure: Code of departure vertex.
+            destination: Code of destination vertex.
+        """
+        self.changes.append(('remove_edge', departure, destination))
+
+
+    def validate(self):
+        """Check the queued changes in order against the graph as it would be after the earlier changes.
+
+        Returns:
+            List of messages describing the invalid changes. Empty if all changes are valid.
+        """
+        graph = self.graph
+        vertices = dict()           # code -> whether the vertex exists after the changes so far
+        edges = dict()              # (departure code, destination code) -> whether the edge exists
+        touched = dict()            # code -> keys in edges the vertex belongs to
+        removed = set()             # codes whose original edges are gone
+
+        def has_vertex(code):
+            return vertices[code] if code in vertices else code in graph.vertices
+
+        def has_edge(departure, destination):
+            if (departure, destination) in edges:
+                return edges[(departure, destination)]
+            return not departure in removed and not destination in removed and \
+                graph.get_edge(departure, destination) is not None
+
+        def set_edge(departure, destination, exists):
+            edges[(departure, destination)] = exists
+            touched.setdefault(departure, set()).add((departure, destination))
+            touched.setdefault(destination, set()).add((departure, destination))
+
+        errors = []
+        for position, change in enumerate(self.changes):
+            kind = change[0]
+            if kind in ('add_vertex', 'edit_vertex'):
+                code = change[1].get('code') if isinstance(change[1], dict) else None
+                if code is None:
+                    errors.append('%d %s: vertex info has no code' % (position, kind))
+                elif kind == 'add_vertex' and has_vertex(code):
+                    errors.append('%d add_vertex %s: city already exists' % (position, code))
+                elif kind == 'edit_vertex' and not has_vertex(code):
+                    errors.append('%d edit_vertex %s: city does not exist' % (position, code))
+                elif any(not key in change[1] for key in VERTEX_KEYS):
+                    errors.append('%d %s %s: vertex info has no %s' % (position, kind, code, ', '.join(
+                        key for key in VERTEX_KEYS if not key in change[1])))
+                elif kind == 'add_vertex':
+                    vertices[code] = True
+            elif kind == 'remove_vertex':
+                code = change[1]
+                if not has_vertex(code):
+                    errors.append('%d remove_vertex %s: city does not exist' % (position, code))
+                else:
+                    vertices[code] = False
+                    removed.add(code)
+                    for key in touched.pop(code, ()):
+                        edges.pop(key, None)
+            elif kind == 'add_edge':
+                departure, destination = change[1], change[2]
+                missing = [code for code in (departure, destination) if not has_vertex(code)]
+                if missing:
+                    errors.append('%d add_edge %s-%s: city %s does not exist' % (position, departure, destination,
+                                                                                 ', '.join(missing)))
+                elif not Edge.valid_distance(change[3]):
+                    errors.append('%d add_edge %s-%s: invalid distance %r' % (position, departure, destination,
+                                                                             change[3]))
+                else:
+                    set_edge(departure, destination, True)
+            else:
+                departure, destination = change[1], change[2]
+                if not has_edge(departure, destination):
+                    errors.append('%d remove_edge %s-%s: flight does not exist' % (position, departure, destination))
+                else:
+                    set_edge(departure, destination, False)
+
+        return errors
+
+
+    def commit(self):
+        """Validate and apply the queued changes, then rebuild the registered indexes once.
+
+        Returns:
+            Number of applied changes.
+        """
+        errors = self.validate()
+        if errors:
+            self.changes = []
+            raise ValueError('Invalid changes in batch: ' + '; '.join(errors))
+
+        graph = self.graph
+        changes, self.changes = self.changes, []
+        undo = []
+        # the indexes and the journal are detached so the single changes are not reported to them
+        indexes, graph.indexes = graph.indexes, []
+        journal, graph.journal = graph.journal, None
+        try:
+            for change in changes:
+                self._apply(change, undo)
+        except Exception:
+            for steps in reversed(undo):
+                for step in steps:
+                    step()
+            raise
+        finally:
+            graph.indexes = indexes
+            graph.journal = journal
+            if changes:
+                graph.rebuild_indexes()
+        if journal is not None and changes:
+            journal.append(('batch', [list(change) for change in changes]))
+
+        return len(changes)
+
+
+    def _apply(self, change, undo):
+        """Apply a change to the graph. The steps undoing it are registered before the graph is touched, so a change
+        that fails halfway is undone as well.
+
+        Args:
+            change: Queued change.
+            undo: List of lists of functions without arguments; the functions undoing the change are appended. Each
+                list is called in order, the lists in reverse order. Undoing a change that was not applied is harmless.
+        """
+        graph = self.graph
+        kind = change[0]
+        if kind == 'add_vertex':
+            code = change[1]['code']
+            undo.append([lambda: graph.remove_vertex(code)])
+            self._check(graph.add_vertex(change[1]), change)
+
+        elif kind == 'edit_vertex':
+            old_vertex = graph.vertices[change[1]['code']].to_json()
+            undo.append([lambda: graph.edit_vertex(old_vertex)])
+            self._check(graph.edit_vertex(change[1]), change)
+
+        elif kind == 'remove_vertex':
+            vertex = graph.vertices[change[1]]
+            old_vertex = vertex.to_json()
+            flights = [(vertex.code, destination.code, edge.distance) for destination, edge in vertex.edges.items()]
+            flights.extend((departure.code, vertex.code, edge.distance) for departure, edge in vertex.in_edges.items()
+                           if departure is not vertex)
+            steps = [lambda: graph.add_vertex(old_vertex)]
+            steps.extend(lambda flight=flight: graph.add_edge(*flight) for flight in flights)
+            undo.append(steps)
+            self._check(graph.remove_vertex(change[1]), change)
+
+        elif kind == 'remove_edge':
+            departure, destination = change[1], change[2]
+            edge = graph.get_edge(departure, destination)
+            undo.append([lambda: graph.add_edge(departure, destination, edge.distance)])
+            self._check(graph.remove_edge(departure, destination), change)
+
+        else:
+            departure, destination = change[1], change[2]
+            edge = graph.get_edge(departure, destination)
+            reverse_edge = graph.get_edge(destination, departure) if graph.symmetric else None
+            if edge is not None:
+                steps = [lambda: graph.add_edge(departure, destination, edge.distance)]
+            else:
+                steps = [lambda: graph.remove_edge(departure, destination)]
+                if reverse_edge is not None:
+                    # in symmetric mode the added edge shared its distance with the reverse edge
+                    steps.append(lambda: graph.add_edge(destination, departure, reverse_edge.distance))
+            undo.append(steps)
+            self._check(graph.add_edge(departure, destination, change[3]), change)
+
+
+    @staticmethod
+    def _check(succeeded, change):
+        """Raise ValueError if a change was not applied.
+
+        Args:
+            succeeded: Result of the Graph method applying the change.
+            change: Applied change.
+        """
+        if not succeeded:
+            raise ValueError('Change could not be applied: %s' % (change,))
@@ -0,0 +1,188 @@
+from .graph_index import GraphIndex
+
+class ConnectivityIndex(GraphIndex):
+    """Connectivity index object.
+
+    Weakly connected components in a union-find structure and strongly connected component labels of the vertices.
+    A path can only exist inside a weakly connected component, and always exists inside a strongly connected one, so
+    both questions are answered in O(1). Inserted edges are merged into the union-find structure right away; removed
+    edges that may split a component mark it outdated and it is recomputed on the next query. Strongly connected
+    components are recomputed the same way after an inserted edge joins two of them or a removed edge lies inside one.
+
+    """
+    def __init__(self):
+        """Constructor of ConnectivityIndex object.
+
+        """
+        self.rebuild(None)
+
+
+    def rebuild(self, graph):
+        self.graph = graph
+        self.parent = dict()
+        self.component = dict()
+        self._next_component = 0
+        self._weak_outdated = graph is not None
+        self._strong_outdated = graph is not None
+
+
+    def _find(self, vertex):
+        """Find the root of the weakly connected component of a vertex, halving the path on the way.
+
+        Args:
+            vertex: Vertex object.
+
+        Returns:
+            Root Vertex object.
+        """
+        parent = self.parent
+        while parent[vertex] is not vertex:
+            parent[vertex] = parent[parent[vertex]]
+            vertex = parent[vertex]
+        return vertex
+
+
+    def _union(self, first, second):
+        """Merge the weakly connected components of two vertices.
+
+        Args:
+            first: Vertex object.
+            second: Vertex object.
+        """
+        first = self._find(first)
+        second = self._find(second)
+        if first is not second:
+            self.parent[second] = first
+
+
+    def _recompute_weak(self):
+        """Recompute the weakly connected components from the graph.
+
+        """
+        self.parent = {vertex: vertex for vertex in self.graph.vertices.values()}
+        for vertex in self.graph.vertices.values():
+            for neighbor in vertex.edges:
+                self._union(vertex, neighbor)
+        self._weak_outdated = False
+
+
+    def _recompute_strong(self):
+        """Recompute the strongly connected component labels from the graph with Tarjan's algorithm.
+
+        """
+        self.component = dict()
+        self._next_component = 0
+        index = dict()
+        lowlink = dict()
+        stack = []
+        on_stack = set()
+        for root in self.graph.vertices.values():
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(root.edges))]
+            while work:
+                vertex, neighbors = work[-1]
+                for neighbor in neighbors:
+                    if not neighbor in index:
+                        index[neighbor] = lowlink[neighbor] = len(index)
+                        stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work.append((neighbor, iter(neighbor.edges)))
+                        break
+                    elif neighbor in on_stack and index[neighbor] < lowlink[vertex]:
+                        lowlink[vertex] = index[neighbor]
+                else:
+                    work.pop()
+                    if work and lowlink[vertex] < lowlink[work[-1][0]]:
+                        lowlink[work[-1][0]] = lowlink[vertex]
+                    if lowlink[vertex] == index[vertex]:
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            self.component[member] = self._next_component
+                            if member is vertex:
+                                break
+                        self._next_component += 1
+        self._strong_outdated = False
+
+
+    def may_reach(self, departure, destination):
+        """Check whether a path from departure to destination may exist.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+
+        Returns:
+            False if there is no path for sure, otherwise True.
+        """
+        if self._weak_outdated:
+            self._recompute_weak()
+        return self._find(departure) is self._find(destination)
+
+
+    def strongly_connected(self, departure, destination):
+        """Check whether departure and destination can reach each other.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+
+        Returns:
+            True if there are paths in both directions.
+        """
+        if self._strong_outdated:
+            self._recompute_strong()
+        return self.component[departure] == self.component[destination]
+
+
+    def components(self):
+        """Get the strongly connected components.
+
+        Returns:
+            List of lists of vertices, largest component first. Ties are ordered by the code of their first vertex.
+        """
+        if self._strong_outdated:
+            self._recompute_strong()
+        groups = dict()
+        for vertex, label in self.component.items():
+            groups.setdefault(label, []).append(vertex)
+        components = [sorted(group, key=lambda vertex: vertex.code) for group in groups.values()]
+        components.sort(key=lambda group: (-len(group), group[0].code))
+
+        return components
+
+
+    def vertex_added(self, vertex):
+        self.parent[vertex] = vertex
+        self.component[vertex] = self._next_component
+        self._next_component += 1
+
+
+    def vertex_removed(self, vertex):
+        # a vertex that still had edges was reported with them, which marked its components outdated
+        self.parent.pop(vertex, None)
+        self.component.pop(vertex, None)
+
+
+    def edge_added(self, edge, replaced_edge):
+        if replaced_edge is not None:
+            return
+        if not self._weak_outdated:
+            self._union(edge.departure, edge.destination)
+        if not self._strong_outdated and self.component[edge.departure] != self.component[edge.destination]:
+            self._strong_outdated = True
+
+
+    def edge_removed(self, edge):
+        departure = edge.departure
+        destination = edge.destination
+        if departure is destination:
+            return
+        if not departure in destination.edges:
+            self._weak_outdated = True
+        if not self._strong_outdated and self.component[departure] == self.component[destination]:
+            self._strong_outdated = True
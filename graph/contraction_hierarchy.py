@@ -0,0 +1,269 @@
+import json
+import hashlib
+from heapq import heapify, heappush, heappop
+
+INFINITY = float('inf')
+
+class ContractionHierarchy(object):
+    """Contraction hierarchy object.
+
+    Preprocessed form of a graph for fast point-to-point shortest path queries. Vertices are contracted one by one
+    in order of importance and shortcuts are added to preserve shortest distances among the remaining vertices.
+    The forward (upward) search graph holds edges to higher ranked vertices, the backward (downward) search graph
+    holds edges from higher ranked vertices. Every edge stores the vertex it bypasses so paths can be unpacked.
+
+    """
+    def __init__(self, codes, rank, forward, backward, fingerprint=None):
+        """Constructor of ContractionHierarchy object.
+
+        Args:
+            codes: List of vertex codes, indexed by vertex id.
+            rank: List holding contraction order of every vertex.
+            forward: List of dicts. forward[v][w] = (distance, middle) for edge v -> w with rank[v] < rank[w].
+            backward: List of dicts. backward[v][u] = (distance, middle) for edge u -> v with rank[u] > rank[v].
+            fingerprint: Fingerprint of the graph the hierarchy is built from.
+        """
+        self.codes = codes
+        self.index = {code: i for i, code in enumerate(codes)}
+        self.rank = rank
+        self.forward = forward
+        self.backward = backward
+        self.fingerprint = fingerprint
+
+
+    @staticmethod
+    def calculate_fingerprint(csr):
+        """Calculate a fingerprint of the vertices and edges of a graph.
+
+        Args:
+            csr: CSRGraph object.
+
+        Returns:
+            Hex digest identifying the graph.
+        """
+        digest = hashlib.sha1()
+        for code in csr.codes:
+            digest.update((code + ';').encode('utf-8'))
+        for departure, destination, distance in sorted(csr.iter_edges()):
+            digest.update(('%d,%d,%d;' % (departure, destination, distance)).encode('utf-8'))
+
+        return digest.hexdigest()
+
+
+    @classmethod
+    def build(cls, csr, witness_limit=500, fingerprint=None):
+        """Build a contraction hierarchy from a CSRGraph object.
+
+        Args:
+            csr: CSRGraph object.
+            witness_limit: Maximum number of vertices settled by a single witness search.
+            fingerprint: Fingerprint of the graph. Calculated if not given.
+
+        Returns:
+            ContractionHierarchy object.
+        """
+        n = len(csr)
+        out_edges = [dict() for v in range(n)]
+        in_edges = [dict() for v in range(n)]
+        for v, w, distance in csr.iter_edges():
+            if v != w and (not w in out_edges[v] or distance < out_edges[v][w][0]):
+                out_edges[v][w] = (distance, None)
+                in_edges[w][v] = (distance, None)
+        deleted_neighbors = [0] * n
+        rank = [0] * n
+        forward = [None] * n
+        backward = [None] * n
+
+        def witness_search(source, excluded, limit, targets):
+            distances = {source: 0}
+            settled = set()
+            heap = [(0, source)]
+            remaining = len(targets)
+            while heap and len(settled) < witness_limit:
+                d, x = heappop(heap)
+                if x in settled:
+                    continue
+                if d > limit:
+                    break
+                settled.add(x)
+                if x in targets:
+                    remaining -= 1
+                    if remaining == 0:
+                        break
+                for y, (distance, middle) in out_edges[x].items():
+                    if y == excluded:
+                        continue
+                    new_distance = d + distance
+                    if new_distance <= limit and new_distance < distances.get(y, INFINITY):
+                        distances[y] = new_distance
+                        heappush(heap, (new_distance, y))
+            return distances
+
+        def find_shortcuts(v):
+            shortcuts = []
+            for u, (in_distance, middle) in in_edges[v].items():
+                targets = {w: in_distance + out_distance for w, (out_distance, middle) in out_edges[v].items() if w != u}
+                if not targets:
+                    continue
+                distances = witness_search(u, v, max(targets.values()), targets)
+                for w, distance in targets.items():
+                    if distances.get(w, INFINITY) > distance:
+                        shortcuts.append((u, w, distance))
+            return shortcuts
+
+        def priority(v):
+            return len(find_shortcuts(v)) - len(in_edges[v]) - len(out_edges[v]) + deleted_neighbors[v]
+
+        heap = [(priority(v), v) for v in range(n)]
+        heapify(heap)
+        order = 0
+        while heap:
+            p, v = heappop(heap)
+            new_priority = priority(v)
+            if heap and new_priority > heap[0][0]:
+                heappush(heap, (new_priority, v))
+                continue
+            for u, w, distance in find_shortcuts(v):
+                if not w in out_edges[u] or distance < out_edges[u][w][0]:
+                    out_edges[u][w] = (distance, v)
+                    in_edges[w][u] = (distance, v)
+            forward[v] = out_edges[v]
+            backward[v] = in_edges[v]
+            for w in out_edges[v]:
+                del in_edges[w][v]
+            for u in in_edges[v]:
+                del out_edges[u][v]
+            for neighbor in set(out_edges[v]) | set(in_edges[v]):
+                deleted_neighbors[neighbor] += 1
+            rank[v] = order
+            order += 1
+
+        if fingerprint is None:
+            fingerprint = cls.calculate_fingerprint(csr)
+
+        return cls(list(csr.codes), rank, forward, backward, fingerprint)
+
+
+    def save(self, addr):
+        """Save the contraction hierarchy to the specified file as a JSON object.
+
+        Args:
+            addr: Saved file address.
+        """
+        def pack(search_graph):
+            return [[[w, distance, middle] for w, (distance, middle) in edges.items()] for edges in search_graph]
+
+        data = dict()
+        data['fingerprint'] = self.fingerprint
+        data['codes'] = self.codes
+        data['rank'] = self.rank
+        data['forward'] = pack(self.forward)
+        data['backward'] = pack(self.backward)
+        with open(addr, 'wt') as out:
+            json.dump(data, out, separators=(',', ':'))
+
+
+    @classmethod
+    def load(cls, addr):
+        """Load a contraction hierarchy saved by save.
+
+        Args:
+            addr: Loaded file address.
+
+        Returns:
+            ContractionHierarchy object.
+        """
+        with open(addr, 'r') as file:
+            data = json.load(file)
+
+        def unpack(search_graph):
+            return [{w: (distance, middle) for w, distance, middle in edges} for edges in search_graph]
+
+        return cls(data['codes'], data['rank'], unpack(data['forward']), unpack(data['backward']), data['fingerprint'])
+
+
+    def calculate_shortest_path(self, cities):
+        """Calculate shortest path with a bidirectional search over the upward and downward search graphs.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+
+        Returns:
+            List of code of shortest_path. None if there is no path.
+        """
+        departure = self.index[cities[0]]
+        destination = self.index[cities[1]]
+        if departure == destination:
+            return [cities[0]]
+
+        search_graphs = (self.forward, self.backward)
+        distances = ({departure: 0}, {destination: 0})
+        previous = ({departure: None}, {destination: None})
+        settled = (set(), set())
+        heaps = ([(0, departure)], [(0, destination)])
+        best_distance = INFINITY
+        meeting_vertex = None
+
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                d, v = heappop(heap)
+                if v in settled[side]:
+                    continue
+                if d >= best_distance:
+                    del heap[:]
+                    continue
+                settled[side].add(v)
+                if v in distances[1 - side] and d + distances[1 - side][v] < best_distance:
+                    best_distance = d + distances[1 - side][v]
+                    meeting_vertex = v
+                for w, (distance, middle) in search_graphs[side][v].items():
+                    new_distance = d + distance
+                    if new_distance < distances[side].get(w, INFINITY):
+                        distances[side][w] = new_distance
+                        previous[side][w] = v
+                        heappush(heap, (new_distance, w))
+
+        if meeting_vertex is None:
+            return None
+        path = []
+        v = meeting_vertex
+        while v is not None:
+            path.append(v)
+            v = previous[0][v]
+        path.reverse()
+        v = previous[1][meeting_vertex]
+        while v is not None:
+            path.append(v)
+            v = previous[1][v]
+
+        return [self.codes[v] for v in self._unpack(path)]
+
+
+    def _unpack(self, path):
+        """Replace shortcuts in a path of the search graphs by the original edges they bypass.
+
+        Args:
+            path: List of vertex ids.
+
+        Returns:
+            List of vertex ids of the path in the original graph.
+        """
+        unpacked = [path[0]]
+        stack = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
+        stack.reverse()
+        while stack:
+            u, w = stack.pop()
+            if self.rank[u] < self.rank[w]:
+                distance, middle = self.forward[u][w]
+            else:
+                distance, middle = self.backward[w][u]
+            if middle is None:
+                unpacked.append(w)
+            else:
+                stack.append((middle, w))
+                stack.append((u, middle))
+
+        return unpacked
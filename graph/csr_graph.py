@@ -0,0 +1,411 @@
+from array import array
+from heapq import heappush, heappop
+from concurrent.futures import ProcessPoolExecutor
+
+_worker_graph = None
+
+def _init_worker(csr):
+    """Store the CSRGraph object shipped to a worker process of calculate_shortest_paths.
+
+    Args:
+        csr: CSRGraph object.
+    """
+    global _worker_graph
+    _worker_graph = csr
+
+
+def _paths_from_source(task):
+    """Solve one origin of calculate_shortest_paths in a worker process.
+
+    Args:
+        task: Tuple of source vertex id and set of destination vertex ids.
+
+    Returns:
+        Dict mapping destination vertex id to list of code of shortest path.
+    """
+    return _worker_graph.paths_from_source(*task)
+
+
+class CSRGraph(object):
+    """Compressed sparse row graph object.
+
+    Read-only snapshot of a Graph object. Vertices are packed to integer ids (in code order) and the adjacency is stored
+    in contiguous offsets/targets/distances arrays, so path queries and summary queries run over flat buffers
+    instead of Vertex and Edge objects.
+
+    """
+    def __init__(self, codes, offsets, targets, distances, populations):
+        """Constructor of CSRGraph object.
+
+        Arrays may also be memoryviews (e.g. of a memory-mapped snapshot).
+
+        Args:
+            codes: List of vertex codes, indexed by vertex id.
+            offsets: Array of length len(codes) + 1. Edges of vertex i are stored in [offsets[i], offsets[i + 1]).
+            targets: Array holding destination vertex id of every edge.
+            distances: Array holding distance of every edge.
+            populations: Array holding population of every vertex, indexed by vertex id.
+        """
+        self.codes = codes
+        self.index = {code: i for i, code in enumerate(codes)}
+        self.offsets = offsets
+        self.targets = targets
+        self.distances = distances
+        self.populations = populations
+
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Pack a Graph object into a CSRGraph object.
+
+        Args:
+            graph: Graph object to be packed.
+
+        Returns:
+            CSRGraph object holding the same vertices and edges.
+        """
+        codes = sorted(graph.vertices)
+        index = {code: i for i, code in enumerate(codes)}
+        offsets = array('q', [0])
+        targets = array('q')
+        distances = array('q')
+        populations = array('q')
+        for code in codes:
+            vertex = graph.vertices[code]
+            for neighbor, edge in vertex.edges.items():
+                targets.append(index[neighbor.code])
+                distances.append(edge.distance)
+            offsets.append(len(targets))
+            populations.append(vertex.population)
+
+        return cls(codes, offsets, targets, distances, populations)
+
+
+    def __getstate__(self):
+        """Pickle state of the CSRGraph object. Memoryview buffers are copied into arrays so they can be pickled.
+
+        """
+        state = dict(self.__dict__)
+        for name in ('offsets', 'targets', 'distances', 'populations'):
+            if isinstance(state[name], memoryview):
+                state[name] = array(state[name].format, state[name].tobytes())
+        return state
+
+
+    def __len__(self):
+        """Number of vertices of the CSRGraph object.
+
+        """
+        return len(self.codes)
+
+
+    def edge_count(self):
+        """Number of directed edges of the CSRGraph object.
+
+        Returns:
+            Number of edges.
+        """
+        return len(self.targets)
+
+
+    def iter_edges(self):
+        """Iterate over all edges.
+
+        Returns:
+            Iterator of (departure id, destination id, distance) tuples.
+        """
+        offsets = self.offsets
+        targets = self.targets
+        distances = self.distances
+        for v in range(len(self.codes)):
+            for i in range(offsets[v], offsets[v + 1]):
+                yield v, targets[i], distances[i]
+
+
+    def single_source(self, source, targets=None):
+        """Run dijkstra's algorithm from a source vertex id.
+
+        Args:
+            source: Id of the source vertex.
+            targets: Set of ids of target vertices. If given, the search stops once all targets are settled.
+
+        Returns:
+            Distance dict and previous dict keyed by vertex id for every discovered vertex.
+        """
+        offsets = self.offsets
+        edge_targets = self.targets
+        distances = self.distances
+        smallest_distance = {source: 0}
+        previous = {source: None}
+        settled = set()
+        heap = [(0, source)]
+        remaining = len(targets) if targets is not None else -1
+        while heap:
+            d, v = heappop(heap)
+            if v in settled:
+                continue
+            settled.add(v)
+            if targets is not None and v in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            for i in range(offsets[v], offsets[v + 1]):
+                neighbor = edge_targets[i]
+                new_distance = d + distances[i]
+                if neighbor not in smallest_distance or new_distance < smallest_distance[neighbor]:
+                    smallest_distance[neighbor] = new_distance
+                    previous[neighbor] = v
+                    heappush(heap, (new_distance, neighbor))
+
+        return smallest_distance, previous
+
+
+    def build_path(self, previous, destination):
+        """Rebuild the list of codes of a path from a previous dict.
+
+        Args:
+            previous: Previous dict keyed by vertex id.
+            destination: Id of destination vertex.
+
+        Returns:
+            List of code of the path. None if destination was not reached.
+        """
+        if destination not in previous:
+            return None
+        path = []
+        vertex = destination
+        while vertex is not None:
+            path.append(self.codes[vertex])
+            vertex = previous[vertex]
+        path.reverse()
+
+        return path
+
+
+    def calculate_shortest_path(self, cities):
+        """Calculate shortest path using dijkstra's algorithm given departure vertex and destination vertex.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+
+        Returns:
+            List of code of shortest_path.
+        """
+        departure = self.index[cities[0]]
+        destination = self.index[cities[1]]
+        smallest_distance, previous = self.single_source(departure, {destination})
+
+        return self.build_path(previous, destination)
+
+
+    def paths_from_source(self, source, targets):
+        """Calculate shortest paths from one source to several targets with a single search.
+
+        Args:
+            source: Id of the source vertex.
+            targets: Set of ids of target vertices.
+
+        Returns:
+            Dict mapping target id to list of code of shortest path (None if there is no path).
+        """
+        smallest_distance, previous = self.single_source(source, targets)
+
+        return {target: self.build_path(previous, target) for target in targets}
+
+
+    def calculate_shortest_paths(self, pairs, workers=None):
+        """Calculate shortest paths for many (departure, destination) pairs.
+
+        Pairs are grouped by departure and each departure is solved with one search. With several workers, departures
+        are distributed over a process pool and the CSRGraph object is shipped once to every worker.
+
+        Args:
+            pairs: List of (departure code, destination code) pairs.
+            workers: Number of worker processes. Searches run in the current process if None or 1.
+
+        Returns:
+            List of shortest paths (list of code, or None if there is no path) in the order of pairs.
+        """
+        pairs = [(self.index[departure], self.index[destination]) for departure, destination in pairs]
+        groups = dict()
+        for source, target in pairs:
+            groups.setdefault(source, set()).add(target)
+        tasks = list(groups.items())
+
+        if workers is None or workers <= 1 or len(tasks) <= 1:
+            results = [self.paths_from_source(source, targets) for source, targets in tasks]
+        else:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+                results = list(executor.map(_paths_from_source, tasks, chunksize=chunksize))
+        paths = {source: result for (source, targets), result in zip(tasks, results)}
+
+        return [paths[source][target] for source, target in pairs]
+
+
+    def hop_limited_search(self, source, max_hops):
+        """Run the Bellman-Ford algorithm by rounds from a source vertex id. Round h relaxes the edges of the vertices
+        whose distance improved in round h - 1, so after round h every distance is the shortest one using at most h
+        edges.
+
+        Args:
+            source: Id of the source vertex.
+            max_hops: Number of rounds.
+
+        Returns:
+            List of distance lists and list of previous arrays, both indexed by round and then by vertex id. Distances
+            are None for vertices not reached yet. previous[h][v] is the vertex before v in round h, or -1 if the
+            distance of v did not improve in round h.
+        """
+        offsets = self.offsets
+        edge_targets = self.targets
+        distances = self.distances
+        smallest_distance = [None] * len(self.codes)
+        smallest_distance[source] = 0
+        rounds = [smallest_distance]
+        previous = [array('q', [-1]) * len(self.codes)]
+        frontier = [source]
+        for h in range(max_hops):
+            last_distance = smallest_distance
+            smallest_distance = list(last_distance)
+            last_previous = array('q', [-1]) * len(self.codes)
+            improved = []
+            for v in frontier:
+                d = last_distance[v]
+                for i in range(offsets[v], offsets[v + 1]):
+                    neighbor = edge_targets[i]
+                    new_distance = d + distances[i]
+                    if smallest_distance[neighbor] is None or new_distance < smallest_distance[neighbor]:
+                        if last_previous[neighbor] == -1:
+                            improved.append(neighbor)
+                        smallest_distance[neighbor] = new_distance
+                        last_previous[neighbor] = v
+            rounds.append(smallest_distance)
+            previous.append(last_previous)
+            frontier = improved
+            if not frontier:
+                break
+
+        return rounds, previous
+
+
+    def calculate_hop_limited_paths(self, cities, max_hops):
+        """Calculate the shortest path with at most h edges for every h up to max_hops.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+            max_hops: Largest number of edges.
+
+        Returns:
+            List indexed by h of (list of code of the path, distance) tuples. None where no path has at most h edges.
+        """
+        departure = self.index[cities[0]]
+        destination = self.index[cities[1]]
+        rounds, previous = self.hop_limited_search(departure, max_hops)
+        paths = []
+        for h in range(max_hops + 1):
+            last_round = min(h, len(rounds) - 1)
+            distance = rounds[last_round][destination]
+            if distance is None:
+                paths.append(None)
+                continue
+            path = [self.codes[destination]]
+            vertex = destination
+            for i in range(last_round, 0, -1):
+                if previous[i][vertex] != -1:
+                    vertex = previous[i][vertex]
+                    path.append(self.codes[vertex])
+            path.reverse()
+            paths.append((path, distance))
+
+        return paths
+
+
+    def _select_edges(self, distance):
+        """Collect all edges with the given distance.
+
+        Args:
+            distance: Distance to be matched.
+
+        Returns:
+            List of (departure code, destination code, distance) tuples.
+        """
+        codes = self.codes
+        return [(codes[v], codes[w], d) for v, w, d in self.iter_edges() if d == distance]
+
+
+    def calculate_longest_edge(self):
+        """Calculate the longest edges.
+
+        Returns:
+            List of (departure code, destination code, distance) tuples with largest distance.
+        """
+        if not self.distances:
+            return []
+        return self._select_edges(max(self.distances))
+
+
+    def calculate_shortest_edge(self):
+        """Calculate the shortest edges.
+
+        Returns:
+            List of (departure code, destination code, distance) tuples with smallest distance.
+        """
+        if not self.distances:
+            return []
+        return self._select_edges(min(self.distances))
+
+
+    def calculate_average_distance(self):
+        """Calculate the average edge distance.
+
+        Returns:
+            Average edge distance.
+        """
+        return sum(self.distances) / len(self.distances)
+
+
+    def calculate_biggest_vertex(self):
+        """Calculate the biggest vertex (by population).
+
+        Returns:
+            Code of vertex with most population.
+        """
+        if not self.populations:
+            return None
+        return self.codes[max(range(len(self.codes)), key=self.populations.__getitem__)]
+
+
+    def calculate_smallest_vertex(self):
+        """Calculate the smallest vertex (by population).
+
+        Returns:
+            Code of vertex with least population.
+        """
+        if not self.populations:
+            return None
+        return self.codes[min(range(len(self.codes)), key=self.populations.__getitem__)]
+
+
+    def calculate_average_vertex_size(self):
+        """Calculate average vertex size.
+
+        Returns:
+            Average vertex size.
+        """
+        return sum(self.populations) / len(self.populations)
+
+
+    def calculate_hub_cities(self):
+        """Calculate hub cities (most direct connections) in the map.
+
+        Returns:
+            List of code of cities with most direct connections.
+        """
+        offsets = self.offsets
+        degrees = [offsets[v + 1] - offsets[v] for v in range(len(self.codes))]
+        if not degrees:
+            return []
+        max_connections = max(degrees)
+
+        return [self.codes[v] for v, degree in enumerate(degrees) if degree == max_connections]
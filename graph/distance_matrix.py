@@ -0,0 +1,199 @@
+from array import array
+from .graph_index import GraphIndex
+
+INFINITY = float('inf')
+
+class DistanceMatrix(GraphIndex):
+    """All-pairs distance matrix object.
+
+    Distance and next-hop matrices over integer vertex ids. Built with repeated single source searches on sparse graphs
+    and with Floyd-Warshall on dense graphs. Adding vertices and adding or shortening edges is repaired in place.
+    Other changes invalidate the matrix and it is rebuilt on the next lookup.
+
+    """
+    def __init__(self):
+        """Constructor of DistanceMatrix object.
+
+        """
+        self.codes = []
+        self.index = dict()
+        self.distances = []
+        self.next_hops = []
+        self.valid = False
+
+
+    def build(self, csr):
+        """Compute the matrices from a CSRGraph object.
+
+        Args:
+            csr: CSRGraph object.
+        """
+        n = len(csr)
+        self.codes = list(csr.codes)
+        self.index = dict(csr.index)
+        if csr.edge_count() * 4 >= n * n:
+            self._floyd_warshall(csr)
+        else:
+            self._repeated_single_source(csr)
+        self.valid = True
+
+
+    def _repeated_single_source(self, csr):
+        """Fill the matrices with one dijkstra search per vertex.
+
+        Args:
+            csr: CSRGraph object.
+        """
+        n = len(csr)
+        self.distances = []
+        self.next_hops = []
+        for source in range(n):
+            smallest_distance, previous = csr.single_source(source)
+            row = array('d', [INFINITY]) * n
+            next_hop = array('q', [-1]) * n
+            for v, distance in smallest_distance.items():
+                row[v] = distance
+            next_hop[source] = source
+            for v in smallest_distance:
+                chain = []
+                while next_hop[v] == -1:
+                    chain.append(v)
+                    v = previous[v]
+                hop = next_hop[v] if v != source else (chain[-1] if chain else source)
+                for w in chain:
+                    next_hop[w] = hop
+            self.distances.append(row)
+            self.next_hops.append(next_hop)
+
+
+    def _floyd_warshall(self, csr):
+        """Fill the matrices with the Floyd-Warshall algorithm, relaxing whole rows at a time.
+
+        Args:
+            csr: CSRGraph object.
+        """
+        n = len(csr)
+        distances = [[INFINITY] * n for i in range(n)]
+        next_hops = [[-1] * n for i in range(n)]
+        for i in range(n):
+            distances[i][i] = 0
+            next_hops[i][i] = i
+        for v, w, distance in csr.iter_edges():
+            if distance < distances[v][w]:
+                distances[v][w] = distance
+                next_hops[v][w] = w
+        for k in range(n):
+            row_k = distances[k]
+            for i in range(n):
+                d_ik = distances[i][k]
+                if d_ik == INFINITY or i == k:
+                    continue
+                row_i = distances[i]
+                hop_i = next_hops[i]
+                hop = hop_i[k]
+                for j, d_kj in enumerate(row_k):
+                    if d_ik + d_kj < row_i[j]:
+                        row_i[j] = d_ik + d_kj
+                        hop_i[j] = hop
+        self.distances = [array('d', row) for row in distances]
+        self.next_hops = [array('q', row) for row in next_hops]
+
+
+    def distance(self, departure, destination):
+        """Look up the shortest distance between two vertices.
+
+        Args:
+            departure: Code of departure vertex.
+            destination: Code of destination vertex.
+
+        Returns:
+            Shortest distance. None if there is no path.
+        """
+        distance = self.distances[self.index[departure]][self.index[destination]]
+        if distance == INFINITY:
+            return None
+        # the matrix stores floats to hold infinity, the edge distances are integers
+        return int(distance)
+
+
+    def path(self, departure, destination):
+        """Reconstruct the shortest path between two vertices from the next-hop matrix.
+
+        Args:
+            departure: Code of departure vertex.
+            destination: Code of destination vertex.
+
+        Returns:
+            List of code of shortest_path. None if there is no path.
+        """
+        v = self.index[departure]
+        w = self.index[destination]
+        if self.next_hops[v][w] == -1:
+            return None
+        path = [self.codes[v]]
+        while v != w:
+            v = self.next_hops[v][w]
+            path.append(self.codes[v])
+
+        return path
+
+
+    def rebuild(self, graph):
+        self.valid = False
+
+
+    def vertex_added(self, vertex):
+        if not self.valid:
+            return
+        n = len(self.codes)
+        self.index[vertex.code] = n
+        self.codes.append(vertex.code)
+        for row in self.distances:
+            row.append(INFINITY)
+        for row in self.next_hops:
+            row.append(-1)
+        row = array('d', [INFINITY]) * (n + 1)
+        row[n] = 0
+        next_hop = array('q', [-1]) * (n + 1)
+        next_hop[n] = n
+        self.distances.append(row)
+        self.next_hops.append(next_hop)
+
+
+    def vertex_removed(self, vertex):
+        self.valid = False
+
+
+    def edge_added(self, edge, replaced_edge):
+        if not self.valid:
+            return
+        u = self.index[edge.departure.code]
+        v = self.index[edge.destination.code]
+        if replaced_edge is not None and edge.distance > replaced_edge.distance and v in self.next_hops[u]:
+            self.valid = False
+            return
+        distance = edge.distance
+        if u == v or distance >= self.distances[u][v]:
+            return
+        row_v = self.distances[v]
+        for i, row_i in enumerate(self.distances):
+            d_iu = row_i[u]
+            if d_iu == INFINITY:
+                continue
+            via = d_iu + distance
+            hop_i = self.next_hops[i]
+            hop = hop_i[u] if i != u else v
+            for j, d_vj in enumerate(row_v):
+                if via + d_vj < row_i[j]:
+                    row_i[j] = via + d_vj
+                    hop_i[j] = hop
+
+
+    def edge_removed(self, edge):
+        if not self.valid:
+            return
+        u = self.index[edge.departure.code]
+        v = self.index[edge.destination.code]
+        # the matrix stays valid if no shortest path leaves u through this edge
+        if u != v and v in self.next_hops[u]:
+            self.valid = False
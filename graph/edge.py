@@ -4,6 +4,8 @@ class Edge(object):
     Directed edge object that stores departure vertex, destination vertex, and distance.
 
     """
+    __slots__ = ('departure', 'destination', 'distance')
+
     def __init__(self, departure, destination, distance):
         """Constructor of edge object.
 
@@ -16,3 +18,33 @@ class Edge(object):
         self.destination = destination
         self.distance = distance
 
+
+    @staticmethod
+    def valid_distance(distance):
+        """Check a distance is a non-negative integer, as the array-backed search structures store them.
+
+        Args:
+            distance: Distance of an edge.
+
+        Returns:
+            True if the distance is valid. Otherwise False.
+        """
+        return type(distance) is int and distance >= 0
+
+
+    def directed_edges(self):
+        """Get the directed edges represented by this object, like Route.directed_edges.
+
+        Returns:
+            List holding this Edge object.
+        """
+        return [self]
+
+
+    def count(self):
+        """Count the directed edges represented by this object, like Route.count.
+
+        Returns:
+            1.
+        """
+        return 1
@@ -1,34 +1,145 @@
+import os
 import json
 import sys
-import math
+from heapq import heappush, heappop
 from .vertex import Vertex
 from .edge import Edge
+from .route import SymmetricEdges
 from .priority_queue import PriorityQueue
+from .csr_graph import CSRGraph
+from .contraction_hierarchy import ContractionHierarchy
+from .distance_matrix import DistanceMatrix
+from .network_statistics import NetworkStatistics
+from .sorted_index import SortedIndex
+from .group_index import GroupIndex
+from .connectivity_index import ConnectivityIndex
+from .result_cache import ResultCache
+from .batch import GraphBatch
+from .journal import ChangeJournal, SEQUENCE_KEY
+from .json_stream import iter_json_items, write_graph_json, DIRECTED_KEY
+from .snapshot import write_snapshot, GraphSnapshot
+from .travel_model import PAID_LEGS, leg_cost, flight_time, layover_time
+
+SHORTEST_PATH_METHODS = ('dijkstra', 'bidirectional', 'astar', 'matrix', 'ch')
 
 class Graph(object):
     """Graph object.
 
-    Graph object that includes vertices and edges info.
+    Graph object that includes vertices and edges info. Vertices are keyed by code and carry an integer id;
+    edges are keyed by (departure id, destination id).
     It also includes several query functions to support special information retrieval.
+    The version counter is increased by every change of vertices or edges, so derived data can tell when it is outdated.
+    Registered indexes (GraphIndex objects) are notified of every change, and an enabled change journal records it.
+    In symmetric mode each pair of vertices stores one Route object with a shared distance for both directions, and
+    edges is a directed view (SymmetricEdges) over the routes; one-way edges are still supported.
 
     """
-    def __init__(self):
+    def __init__(self, symmetric=False):
         """Constructor of Graph object.
 
+        Args:
+            symmetric: Store each route once for both directions.
         """
+        self.symmetric = symmetric
         self.vertices = dict()
-        self.edges = dict()
-
-
-    def load(self, addr):
+        self.edges = SymmetricEdges() if symmetric else dict()
+        self._next_vertex_id = 0
+        self._free_vertex_ids = []
+        self.version = 0
+        self._heuristic_scale = None
+        self._layover_times = None
+        self._csr = None
+        self._sorted_vertices = None
+        self._contraction_hierarchy = None
+        self.indexes = []
+        self.distance_matrix = None
+        self.statistics = None
+        self.sorted_index = None
+        self.group_index = None
+        self.connectivity = None
+        self.result_cache = None
+        self.journal = None
+
+
+    def load(self, addr, journal=None):
         """Load data to update Graph object from specified file containing JSON object.
 
         Args:
             addr: Loaded file address.
+            journal: Address of the change journal kept with the file. Its changes made after the file was written are
+                replayed, and later changes are recorded in it (see enable_journal). Optional.
         """
         data = self.load_json(addr)
         self.load_vertices(data)
         self.load_edges(data)
+        if journal is not None:
+            change_journal = ChangeJournal(self, journal, addr)
+            change_journal.replay(data.get(SEQUENCE_KEY, 0))
+            self.journal = change_journal
+        self.rebuild_indexes()
+
+
+    def load_stream(self, addr, chunk_size=65536, progress=None):
+        """Load data to update Graph object from specified file containing JSON object, parsing it incrementally.
+
+        Vertices and edges are built while the metros and routes arrays are read, so the file text and the parsed JSON
+        object are never held in memory as a whole. Routes listed before their ports are held back until the end of
+        the file as (departure, destination, distance) tuples, so a file listing its routes before its metros still
+        needs memory growing with the number of routes. The result is the same as load, provided a directed routes marker comes before the routes, as in
+        the files written by write_json.
+
+        Args:
+            addr: Loaded file address.
+            chunk_size: Number of bytes read at a time.
+            progress: Function called with (bytes read, total bytes) after every chunk. Optional.
+        """
+        pending_routes = []
+        directed = False
+        for key, item in iter_json_items(addr, ('metros', 'routes', DIRECTED_KEY), chunk_size, progress):
+            if key == 'metros':
+                self.store_vertex(Vertex(item))
+            elif key == DIRECTED_KEY:
+                directed = item
+            elif item['ports'][0] in self.vertices and item['ports'][1] in self.vertices:
+                self.load_route(item, directed)
+            else:
+                pending_routes.append((item['ports'][0], item['ports'][1], item['distance']))
+        for departure, destination, distance in pending_routes:
+            self.load_route({'ports': (departure, destination), 'distance': distance}, directed)
+        self.version += 1
+        self.rebuild_indexes()
+
+
+    def load_snapshot(self, addr):
+        """Load data to update Graph object from specified binary snapshot file written by save_snapshot.
+
+        Args:
+            addr: Loaded file address.
+        """
+        with GraphSnapshot(addr) as snapshot:
+            offsets = snapshot.columns['offsets']
+            targets = snapshot.columns['targets']
+            distances = snapshot.columns['distances']
+            codes = snapshot.codes()
+            for v in range(snapshot.vertex_count):
+                self.store_vertex(Vertex(snapshot.vertex_json(v)))
+            for v in range(snapshot.vertex_count):
+                for i in range(offsets[v], offsets[v + 1]):
+                    self.build_edge(codes[v], codes[targets[i]], distances[i])
+        self.version += 1
+        self.rebuild_indexes()
+
+
+    def save_snapshot(self, addr):
+        """Save the Graph object to the specified file in the binary snapshot format.
+
+        The snapshot can be loaded back with load_snapshot, or opened with GraphSnapshot for memory-mapped access
+        without building Vertex and Edge objects.
+
+        Args:
+            addr: Saved file address.
+        """
+        write_snapshot(self, addr)
 
 
     @staticmethod
@@ -55,22 +166,73 @@ class Graph(object):
             data: JSON object.
         """
         for city in data['metros']:
-            self.vertices[city['code']] = Vertex(city)  
+            self.store_vertex(Vertex(city))
+        self.version += 1
 
 
     def load_edges(self, data):
-        """Load graph edges info from JSON object.
+        """Load graph edges info from JSON object. Each route is loaded in both directions, unless the object is marked
+        with a true directed routes key (as the snapshots of a change journal are), in which case each route is one
+        directed edge.
 
         Args:
             data: JSON object.
         """
+        directed = data.get(DIRECTED_KEY, False)
         for route in data['routes']:
-            self.edges[route['ports'][0] + "," + route['ports'][1]] = self.build_edge(route['ports'][0], route['ports'][1], route['distance'])
-            self.edges[route['ports'][1] + "," + route['ports'][0]] = self.build_edge(route['ports'][1], route['ports'][0], route['distance'])
+            self.load_route(route, directed)
+        self.version += 1
+
+
+    def load_route(self, route, directed=False):
+        """Load the two directed edges of a route from JSON object. Raise ValueError if the distance is not a
+        non-negative integer.
+
+        Args:
+            route: JSON object holding ports and distance of the route.
+            directed: Load only the edge from the first port to the second.
+        """
+        if not Edge.valid_distance(route['distance']):
+            raise ValueError('Invalid distance of route %s-%s: %r' % (route['ports'][0], route['ports'][1],
+                                                                       route['distance']))
+        self.build_edge(route['ports'][0], route['ports'][1], route['distance'])
+        if not directed:
+            self.build_edge(route['ports'][1], route['ports'][0], route['distance'])
+
+
+    def store_vertex(self, vertex):
+        """Store a Vertex object under its code and assign it an integer id. Ids of removed vertices are reused.
+
+        Args:
+            vertex: Vertex object to be stored.
+        """
+        if vertex.code in self.vertices:
+            vertex.id = self.vertices[vertex.code].id
+        elif self._free_vertex_ids:
+            vertex.id = self._free_vertex_ids.pop()
+        else:
+            vertex.id = self._next_vertex_id
+            self._next_vertex_id += 1
+        self.vertices[vertex.code] = vertex
+
+
+    def get_edge(self, departure, destination):
+        """Get the edge between two vertices.
+
+        Args:
+            departure: Code of departure vertex.
+            destination: Code of destination vertex.
+
+        Returns:
+            Edge object. None if either vertex or the edge does not exist.
+        """
+        if departure in self.vertices and destination in self.vertices:
+            return self.edges.get((self.vertices[departure].id, self.vertices[destination].id))
+        return None
 
 
     def build_edge(self, departure, destination, distance):
-        """Build edge according to edge information.
+        """Build edge according to edge information and store it.
 
         Args:
             departure: Departure vertex code.
@@ -82,8 +244,13 @@ class Graph(object):
         """
         departure = self.vertices[departure]
         destination = self.vertices[destination]
+        if self.symmetric:
+            route = self.edges.add(departure, destination, distance)
+            departure.add_edge(route, destination)
+            return route.edge(departure)
         edge = Edge(departure, destination, distance)
         departure.add_edge(edge, destination)
+        self.edges[(departure.id, destination.id)] = edge
 
         return edge
 
@@ -97,19 +264,53 @@ class Graph(object):
         Returns:
             True if removal is ok. Otherwise False.
         """
-        if not code in self.vertices:
-            return False
-        else:
-            edges_to_be_removed = []
-            for key, edge in self.edges.items():
-                if edge.departure.code == code or edge.destination.code == code:
-                    edges_to_be_removed.append(key)
-                    if edge.destination.code == code:
-                        edge.departure.remove_edge(edge.destination)
-            for edge in edges_to_be_removed:
-                del self.edges[edge]
-            del self.vertices[code]
-            return True
+        return self.remove_vertices([code])
+
+
+    def remove_vertices(self, codes):
+        """Remove several vertices from the Graph object and their connected edges in one pass. If any code does not
+        exist, nothing is removed and False is returned.
+
+        Only the edges incident to the removed vertices are visited, found through their outgoing and incoming edges.
+
+        Args:
+            codes: List of code of vertices to be removed.
+
+        Returns:
+            True if removal is ok. Otherwise False.
+        """
+        for code in codes:
+            if not code in self.vertices:
+                return False
+
+        vertices = [self.vertices[code] for code in dict.fromkeys(codes)]
+        for vertex in vertices:
+            for destination in list(vertex.edges):
+                self._unlink_edge(vertex, destination)
+            for departure in list(vertex.in_edges):
+                self._unlink_edge(departure, vertex)
+        for vertex in vertices:
+            del self.vertices[vertex.code]
+            self._free_vertex_ids.append(vertex.id)
+        self.version += 1
+        self._record_change('remove_vertices', [vertex.code for vertex in vertices])
+        for vertex in vertices:
+            for index in self.indexes:
+                index.vertex_removed(vertex)
+        return True
+
+
+    def _unlink_edge(self, departure, destination):
+        """Remove the edge between two vertices from the vertices and the edge dict, and notify the indexes.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+        """
+        departure.remove_edge(destination)
+        edge = self.edges.pop((departure.id, destination.id))
+        for index in self.indexes:
+            index.edge_removed(edge)
 
 
     def remove_edge(self, departure, destination):
@@ -122,9 +323,10 @@ class Graph(object):
         Returns:
             True if removal is ok. Otherwise False.
         """
-        if departure in self.vertices and destination in self.vertices and departure + "," + destination in self.edges:
-            self.vertices[departure].remove_edge(self.vertices[destination])
-            del self.edges[departure + "," + destination]
+        if self.get_edge(departure, destination) is not None:
+            self._unlink_edge(self.vertices[departure], self.vertices[destination])
+            self.version += 1
+            self._record_change('remove_edge', departure, destination)
             return True
         else:
             return False
@@ -141,14 +343,20 @@ class Graph(object):
         """
         if not vertex['code'] in self.vertices:
             vertex_to_be_added = Vertex(vertex)
-            self.vertices[vertex_to_be_added.code] = vertex_to_be_added
+            self.store_vertex(vertex_to_be_added)
+            self.version += 1
+            self._record_change('add_vertex', vertex)
+            for index in self.indexes:
+                index.vertex_added(vertex_to_be_added)
             return True
         else:
             return False
 
 
     def add_edge(self, departure, destination, distance):
-        """Add an edge from the Graph object. If connected city is missed, return false. Otherwise true.
+        """Add an edge from the Graph object. If connected city is missed or the distance is not a non-negative integer,
+        return false. Otherwise true.
+        In symmetric mode the distance of the reverse edge, if it exists, changes as well.
 
         Args:
             departure: Code of departure vertex.
@@ -158,10 +366,17 @@ class Graph(object):
         Returns:
             True if addition is ok. Otherwise False.
         """
-        if departure in self.vertices and destination in self.vertices:
-            edge = Edge(self.vertices[departure], self.vertices[destination], distance)
-            self.edges[departure + "," + destination] = edge
-            self.vertices[departure].add_edge(edge, self.vertices[destination])
+        if departure in self.vertices and destination in self.vertices and Edge.valid_distance(distance):
+            replaced_edge = self.get_edge(departure, destination)
+            reverse_edge = self.get_edge(destination, departure) if self.symmetric else None
+            edge = self.build_edge(departure, destination, distance)
+            self.version += 1
+            self._record_change('add_edge', departure, destination, distance)
+            for index in self.indexes:
+                index.edge_added(edge, replaced_edge)
+            if reverse_edge is not None and reverse_edge.distance != distance:
+                for index in self.indexes:
+                    index.edge_added(self.get_edge(destination, departure), reverse_edge)
             return True
         else:
             return False
@@ -178,28 +393,316 @@ class Graph(object):
             True if edit is ok. Otherwise Fasle.
         """
         if vertex['code'] in self.vertices:
-            self.vertices[vertex['code']].edit(vertex)
+            edited_vertex = self.vertices[vertex['code']]
+            old_vertex = edited_vertex.to_json()
+            edited_vertex.edit(vertex)
+            self.version += 1
+            self._record_change('edit_vertex', vertex)
+            for index in self.indexes:
+                index.vertex_edited(edited_vertex, old_vertex)
             return True
         else:
             return False
 
 
+    def _record_change(self, *change):
+        """Record a change in the change journal, if it is enabled.
+
+        Args:
+            change: Name of the Graph method that made the change, followed by its arguments.
+        """
+        if self.journal is not None:
+            self.journal.append(change)
+
+
+    def enable_journal(self, addr, snapshot, flush_every=64, compact_every=4096):
+        """Opt in to recording changes in an append-only journal instead of saving the whole graph after each change.
+        The graph is written to the snapshot file first; load(snapshot, journal=addr) restores the graph with the
+        recorded changes. See ChangeJournal.
+
+        Args:
+            addr: Journal file address. The file is emptied.
+            snapshot: Snapshot file address.
+            flush_every: Number of buffered changes that triggers a flush. None to flush only when journal.flush is
+                called.
+            compact_every: Number of journaled changes that triggers a compaction into a fresh snapshot. None to
+                compact only when journal.compact is called.
+
+        Returns:
+            The ChangeJournal object.
+        """
+        self.journal = ChangeJournal(self, addr, snapshot, flush_every, compact_every)
+        self.journal.compact()
+
+        return self.journal
+
+
+    def batch(self):
+        """Start a transaction of changes, used as a context manager:
+
+            with graph.batch() as batch:
+                batch.add_vertex(vertex)
+                batch.add_edge(departure, destination, distance)
+
+        The changes are validated together and applied atomically when the block ends, and the registered indexes are
+        rebuilt once instead of being notified of every change. See GraphBatch.
+
+        Returns:
+            GraphBatch object.
+        """
+        return GraphBatch(self)
+
+
+    def add_index(self, index):
+        """Register an index that is kept up to date with changes of the Graph object.
+
+        Args:
+            index: GraphIndex object. It is rebuilt from the current graph.
+
+        Returns:
+            The registered index.
+        """
+        self.indexes.append(index)
+        index.rebuild(self)
+
+        return index
+
+
+    def rebuild_indexes(self):
+        """Rebuild all registered indexes from the current graph.
+
+        """
+        for index in self.indexes:
+            index.rebuild(self)
+
+
+    def enable_distance_matrix(self):
+        """Opt in to the all-pairs distance matrix used by calculate_distance and calculate_shortest_path(method='matrix').
+
+        Returns:
+            The DistanceMatrix object.
+        """
+        if self.distance_matrix is None:
+            self.distance_matrix = self.add_index(DistanceMatrix())
+
+        return self.distance_matrix
+
+
+    def enable_statistics(self):
+        """Opt in to incrementally maintained network statistics. Afterwards the longest/shortest edge, average distance,
+        biggest/smallest/average vertex and hub city queries are answered without scanning the graph.
+
+        Returns:
+            The NetworkStatistics object.
+        """
+        if self.statistics is None:
+            self.statistics = self.add_index(NetworkStatistics())
+
+        return self.statistics
+
+
+    def enable_sorted_index(self):
+        """Opt in to the index of edges sorted by distance and vertices sorted by population used by the top-k, range and
+        percentile queries. The queries enable it on first use.
+
+        Returns:
+            The SortedIndex object.
+        """
+        if self.sorted_index is None:
+            self.sorted_index = self.add_index(SortedIndex())
+
+        return self.sorted_index
+
+
+    def enable_group_index(self):
+        """Opt in to the indexes of vertices by continent, country and region. Afterwards calculate_continents_info is
+        answered from the index. The group queries enable it on first use.
+
+        Returns:
+            The GroupIndex object.
+        """
+        if self.group_index is None:
+            self.group_index = self.add_index(GroupIndex())
+
+        return self.group_index
+
+
+    def enable_connectivity_index(self):
+        """Opt in to the connectivity index. Afterwards calculate_shortest_path returns None right away for cities in
+        different components. calculate_components enables it on first use.
+
+        Returns:
+            The ConnectivityIndex object.
+        """
+        if self.connectivity is None:
+            self.connectivity = self.add_index(ConnectivityIndex())
+
+        return self.connectivity
+
+
+    def enable_result_cache(self, size=1024):
+        """Opt in to caching the results of calculate_shortest_path and calculate_route_info. Cached results are
+        dropped as soon as the graph changes.
+
+        Args:
+            size: Largest number of results kept. The least recently used result is evicted first.
+
+        Returns:
+            The ResultCache object.
+        """
+        if self.result_cache is None:
+            self.result_cache = ResultCache(size)
+
+        return self.result_cache
+
+
+    def _current_distance_matrix(self):
+        """Get the all-pairs distance matrix, enabling it and recomputing it if it is not valid.
+
+        Returns:
+            The DistanceMatrix object.
+        """
+        distance_matrix = self.enable_distance_matrix()
+        if not distance_matrix.valid:
+            distance_matrix.build(self.freeze())
+
+        return distance_matrix
+
+
+    def calculate_distance(self, cities):
+        """Calculate the shortest distance between two vertices with the all-pairs distance matrix.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+
+        Returns:
+            Shortest distance. None if there is no path.
+        """
+        return self._current_distance_matrix().distance(cities[0], cities[1])
+
+
+    def freeze(self):
+        """Take a compressed sparse row snapshot of the Graph object. Later changes to the Graph object are not reflected in it.
+
+        Returns:
+            A CSRGraph object holding current vertices and edges.
+        """
+        return CSRGraph.from_graph(self)
+
+
+    def _current_csr(self):
+        """Get a CSRGraph snapshot of the current vertices and edges. It is cached until the graph changes.
+
+        Returns:
+            CSRGraph object.
+        """
+        if self._csr is None or self._csr[0] != self.version:
+            self._csr = (self.version, self.freeze())
+
+        return self._csr[1]
+
+
+    def build_contraction_hierarchy(self, addr=None):
+        """Preprocess the Graph object into a contraction hierarchy used by calculate_shortest_path(method='ch').
+
+        If addr holds a hierarchy built from identical vertices and edges, it is loaded instead of rebuilt.
+        Otherwise the hierarchy is built and saved to addr.
+
+        Args:
+            addr: Address of the file persisting the hierarchy (e.g. "json/map_data.ch.json"). Optional.
+
+        Returns:
+            The ContractionHierarchy object.
+        """
+        csr = self.freeze()
+        fingerprint = ContractionHierarchy.calculate_fingerprint(csr)
+        hierarchy = None
+        if addr is not None and os.path.exists(addr):
+            hierarchy = ContractionHierarchy.load(addr)
+            if hierarchy.fingerprint != fingerprint:
+                hierarchy = None
+        if hierarchy is None:
+            hierarchy = ContractionHierarchy.build(csr, fingerprint=fingerprint)
+            if addr is not None:
+                hierarchy.save(addr)
+        self._contraction_hierarchy = (self.version, hierarchy)
+
+        return hierarchy
+
+
+    def calculate_shortest_paths(self, pairs, workers=None):
+        """Calculate shortest paths for many (departure, destination) pairs, one search per departure.
+
+        Args:
+            pairs: List of (departure code, destination code) pairs.
+            workers: Number of worker processes to distribute departures over. Runs in the current process if None or 1.
+
+        Returns:
+            List of shortest paths (list of code, or None if there is no path) in the order of pairs.
+        """
+        return self.freeze().calculate_shortest_paths(pairs, workers)
+
+
+    def calculate_hop_limited_paths(self, cities, max_hops):
+        """Calculate the shortest path with at most h flights for every h up to max_hops in one call, with the
+        Bellman-Ford algorithm by rounds over the edge arrays of a CSRGraph snapshot.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+            max_hops: Largest number of flights.
+
+        Returns:
+            List indexed by number of flights h of (list of code of the path, distance) tuples. None where no path
+            has at most h flights.
+        """
+        return self._current_csr().calculate_hop_limited_paths(cities, max_hops)
+
+
+    def _flights(self):
+        """Get the stored flight objects: Edge objects, or Route objects in symmetric mode.
+
+        Returns:
+            Iterable of Edge or Route objects, both providing distance, count and directed_edges.
+        """
+        if self.symmetric:
+            return self.edges.routes.values()
+        return self.edges.values()
+
+
+    @staticmethod
+    def _directed_edges(flights):
+        """Expand flight objects into directed edges.
+
+        Args:
+            flights: List of Edge or Route objects.
+
+        Returns:
+            List of Edge objects.
+        """
+        edges = []
+        for flight in flights:
+            edges.extend(flight.directed_edges())
+        return edges
+
+
     def calculate_longest_edge(self):
         """Calculate the longest edges.
 
         Returns:
             Edge list with largest distance.
         """
+        if self.statistics is not None:
+            return self.statistics.longest_edges()
         longest_flight = []
         largest_distance = 0
-        for flight in self.edges.values():
+        for flight in self._flights():
             if flight.distance > largest_distance:
                 largest_distance = flight.distance
                 longest_flight = [flight]
             elif flight.distance == largest_distance:
                 longest_flight.append(flight)
 
-        return longest_flight
+        return self._directed_edges(longest_flight)
 
 
     def calculate_shortest_edge(self):
@@ -208,16 +711,18 @@ class Graph(object):
         Returns:
             Edge list with smallest distance.
         """
+        if self.statistics is not None:
+            return self.statistics.shortest_edges()
         shortest_flight = []
         smallest_distance = sys.maxsize
-        for flight in self.edges.values():
+        for flight in self._flights():
             if flight.distance < smallest_distance:
                 smallest_distance = flight.distance
                 shortest_flight = [flight]
             elif flight.distance == smallest_distance:
                 shortest_flight.append(flight)
 
-        return shortest_flight
+        return self._directed_edges(shortest_flight)
 
 
     def calculate_average_distance(self):
@@ -226,19 +731,72 @@ class Graph(object):
         Returns:
             Average edge distance.
         """
+        if self.statistics is not None:
+            return self.statistics.average_distance()
         average_distance = 0
-        for flight in self.edges.values():
-            average_distance += flight.distance
+        for flight in self._flights():
+            average_distance += flight.distance * flight.count()
 
         return average_distance / len(self.edges)
 
 
+    def calculate_longest_edges(self, k):
+        """Calculate the k longest edges with the sorted index.
+
+        Args:
+            k: Number of edges.
+
+        Returns:
+            Edge list with at most k edges, longest first.
+        """
+        return self.enable_sorted_index().distances.largest(k)
+
+
+    def calculate_shortest_edges(self, k):
+        """Calculate the k shortest edges with the sorted index.
+
+        Args:
+            k: Number of edges.
+
+        Returns:
+            Edge list with at most k edges, shortest first.
+        """
+        return self.enable_sorted_index().distances.smallest(k)
+
+
+    def calculate_edges_within(self, minimum, maximum):
+        """Calculate all edges with distance in a range with the sorted index.
+
+        Args:
+            minimum: Smallest accepted distance.
+            maximum: Largest accepted distance.
+
+        Returns:
+            Edge list sorted by distance.
+        """
+        return self.enable_sorted_index().distances.within(minimum, maximum)
+
+
+    def calculate_distance_percentile(self, percent):
+        """Calculate a percentile of edge distances (nearest-rank) with the sorted index.
+
+        Args:
+            percent: Percentile between 0 and 100.
+
+        Returns:
+            Edge distance at the percentile. None if there are no edges.
+        """
+        return self.enable_sorted_index().distances.percentile(percent)
+
+
     def calculate_biggest_vertex(self):
         """Calculate the biggest vertex (by population).
 
         Returns:
             Vertex with most population.
         """
+        if self.statistics is not None:
+            return self.statistics.biggest_vertex()
         biggest_city = None
         largest_pop = 0
         for city in self.vertices.values():
@@ -255,6 +813,8 @@ class Graph(object):
         Returns:
             Vertex with least population.
         """
+        if self.statistics is not None:
+            return self.statistics.smallest_vertex()
         smallest_city = None
         smallest_pop = sys.maxsize
         for city in self.vertices.values():
@@ -271,6 +831,8 @@ class Graph(object):
         Returns:
             Average vertex size.
         """
+        if self.statistics is not None:
+            return self.statistics.average_vertex_size()
         average_city_size = 0
         for city in self.vertices.values():
             average_city_size += city.population
@@ -278,12 +840,63 @@ class Graph(object):
         return average_city_size / len(self.vertices)
 
 
+    def calculate_biggest_vertices(self, k):
+        """Calculate the k biggest vertices (by population) with the sorted index.
+
+        Args:
+            k: Number of vertices.
+
+        Returns:
+            Vertex list with at most k vertices, biggest first.
+        """
+        return self.enable_sorted_index().populations.largest(k)
+
+
+    def calculate_smallest_vertices(self, k):
+        """Calculate the k smallest vertices (by population) with the sorted index.
+
+        Args:
+            k: Number of vertices.
+
+        Returns:
+            Vertex list with at most k vertices, smallest first.
+        """
+        return self.enable_sorted_index().populations.smallest(k)
+
+
+    def calculate_vertices_within(self, minimum, maximum):
+        """Calculate all vertices with population in a range with the sorted index.
+
+        Args:
+            minimum: Smallest accepted population.
+            maximum: Largest accepted population.
+
+        Returns:
+            Vertex list sorted by population.
+        """
+        return self.enable_sorted_index().populations.within(minimum, maximum)
+
+
+    def calculate_population_percentile(self, percent):
+        """Calculate a percentile of vertex populations (nearest-rank) with the sorted index.
+
+        Args:
+            percent: Percentile between 0 and 100.
+
+        Returns:
+            Population at the percentile. None if there are no vertices.
+        """
+        return self.enable_sorted_index().populations.percentile(percent)
+
+
     def calculate_continents_info(self):
         """Calculate continent info and its corresponding cities info.
 
         Returns:
             A dict with keys are continent info and values are cities info in the corresponding continent.
         """
+        if self.group_index is not None:
+            return {continent: list(cities.values()) for continent, cities in self.group_index.vertices['continent'].items()}
         continents_dict = dict()
         for city in self.vertices.values():
             if not city.continent in continents_dict:
@@ -293,12 +906,58 @@ class Graph(object):
         return continents_dict
 
 
+    def calculate_vertices_by(self, attribute, value):
+        """Calculate the vertices with a given continent, country or region with the group index.
+
+        Args:
+            attribute: 'continent', 'country' or 'region'.
+            value: Value of the attribute.
+
+        Returns:
+            List of vertices.
+        """
+        return list(self.enable_group_index().vertices[attribute].get(value, dict()).values())
+
+
+    def calculate_population_by(self, attribute):
+        """Calculate the total population of every continent, country or region with the group index.
+
+        Args:
+            attribute: 'continent', 'country' or 'region'.
+
+        Returns:
+            A dict with keys are attribute values and values are total populations.
+        """
+        return dict(self.enable_group_index().populations[attribute])
+
+
+    def calculate_route_counts_between_continents(self):
+        """Calculate the number of edges between every pair of continents with the group index.
+
+        Returns:
+            A dict with keys are (departure continent, destination continent) and values are numbers of edges.
+        """
+        return dict(self.enable_group_index().route_counts)
+
+
+    def calculate_components(self):
+        """Calculate the strongly connected components (cities that can all reach each other) with the connectivity
+        index.
+
+        Returns:
+            List of lists of code, largest component first.
+        """
+        return [[vertex.code for vertex in component] for component in self.enable_connectivity_index().components()]
+
+
     def calculate_hub_cities(self):
         """Calculate hub cities (most direct connections) in the map.
 
         Returns:
             An array of cities with most direct connections.
         """
+        if self.statistics is not None:
+            return self.statistics.hub_vertices()
         hub_cities = []
         max_connections = 0
         for city in self.vertices.values():
@@ -318,8 +977,9 @@ class Graph(object):
             An url that is used to generate map.
         """
         url = 'http://www.gcmap.com/mapui?P='
-        for route in self.edges.values():
-            url += route.departure.code + '-' + route.destination.code + ', '
+        for flight in self._flights():
+            for route in flight.directed_edges():
+                url += route.departure.code + '-' + route.destination.code + ', '
 
         return url
 
@@ -341,7 +1001,23 @@ class Graph(object):
 
 
     def calculate_route_info(self, route):
-        """Calculate the cost and time of a given valid route.
+        """Calculate the cost and time of a given valid route. With the result cache enabled, repeated routes are
+        answered from it.
+
+        Args:
+            route: List of cities' code.
+
+        Returns:
+            Cost and time of the route.
+        """
+        if self.result_cache is not None:
+            return self.result_cache.lookup(self.version, ('route_info', tuple(route)),
+                                            lambda: self._calculate_route_info(route))
+        return self._calculate_route_info(route)
+
+
+    def _calculate_route_info(self, route):
+        """Calculate the cost and time of a given valid route without the result cache.
 
         Args:
             route: List of cities' code.
@@ -354,20 +1030,11 @@ class Graph(object):
         for i in range(len(route) - 1):
             departure = self.vertices[route[i]]
             destination = self.vertices[route[i + 1]]
-            distance = self.edges[departure.code + "," + destination.code].distance
-            # calculate cost
-            if 0.35 - 0.05 * i >= 0:
-                cost += distance * (0.35 - 0.05 * i)
-            # caculate flight time
-            if distance < 400:
-                a = 1406.25 # accleration
-                time += math.sqrt(2 * distance / a)
-            else:
-                time += 400 / 375 + (distance - 400) / 750
-            #calculate layover time
+            distance = self.edges[(departure.id, destination.id)].distance
+            cost += leg_cost(distance, i)
+            time += flight_time(distance)
             if i != len(route) - 2:
-                if 2 - (len(destination.edges) - 1) * 10 / 60 > 0:
-                    time += 2 - (len(destination.edges) - 1) * 10 / 60
+                time += layover_time(destination)
 
         return float("%.2f" % cost), float("%.2f" % time)
 
@@ -382,74 +1049,723 @@ class Graph(object):
         graph_json['metros'] = []
         graph_json['routes'] = []
 
-        for key in sorted(self.vertices):
-            metro = dict()
-            metro['code'] = self.vertices[key].code
-            metro['name'] = self.vertices[key].name
-            metro['country'] = self.vertices[key].country
-            metro['continent'] = self.vertices[key].continent
-            metro['timezone'] = self.vertices[key].timezone
-            metro['coordinates'] = json.loads(self.vertices[key].coordinates.replace("\'", "\""))
-            metro['population'] = self.vertices[key].population
-            metro['region'] = self.vertices[key].region
-            graph_json['metros'].append(metro)
-
-        for key in sorted(self.edges):
-            route = dict()
-            route['ports'] = [self.edges[key].departure.code, self.edges[key].destination.code]
-            route['distance'] = self.edges[key].distance
-            graph_json['routes'].append(route)
+        vertices = self.sorted_vertices()
+        for vertex in vertices:
+            graph_json['metros'].append(vertex.to_json())
+
+        for vertex in vertices:
+            for destination in sorted(vertex.edges, key=lambda destination: destination.code):
+                route = dict()
+                route['ports'] = [vertex.code, destination.code]
+                route['distance'] = vertex.edges[destination].distance
+                graph_json['routes'].append(route)
 
         return graph_json
 
 
-    def calculate_shortest_path(self, cities):
-        """Calculate shortest path using dijkstra's algorithm given departure vertex and destination vertex.
+    def write_json(self, out, sort=True, chunk_size=1024, extra_fields=None):
+        """Write the Graph object to a file object as JSON without building the JSON object of convert_to_json.
+        The text is the same as json.dump(self.convert_to_json(), out, sort_keys=True, indent=4, separators=(',', ': ')).
+
+        Args:
+            out: File object opened in text mode.
+            sort: Keep the order of convert_to_json. False to write vertices and edges in stored order, which is faster.
+            chunk_size: Number of metros or routes written at a time.
+            extra_fields: Dict of additional top-level values. Optional.
+        """
+        write_graph_json(self, out, sort, chunk_size, extra_fields)
+
+
+    def sorted_vertices(self):
+        """Get the vertices sorted by code. The order is kept until the graph changes.
+
+        Returns:
+            List of Vertex objects.
+        """
+        if self._sorted_vertices is None or self._sorted_vertices[0] != self.version:
+            self._sorted_vertices = (self.version, sorted(self.vertices.values(), key=lambda vertex: vertex.code))
+        return self._sorted_vertices[1]
+
+
+    def calculate_shortest_path(self, cities, method='dijkstra', queue=PriorityQueue):
+        """Calculate shortest path given departure vertex and destination vertex.
+
+        Vertices are discovered lazily and the search stops as soon as the destination is settled,
+        so the cost depends on the explored region rather than the whole graph. With the connectivity index
+        enabled, cities in different components are answered without a search. With the result cache enabled,
+        repeated queries are answered from it.
 
         Args:
             cities: List holding code of departure vertex and destination vertex.
+            method: 'dijkstra' for a single search from the departure, 'bidirectional' for simultaneous searches
+                from both ends, 'astar' for a search guided by the great-circle distance to the destination, 'ch' for a
+                query on the contraction hierarchy (built first if missing or outdated), 'matrix' for a lookup in the
+                all-pairs distance matrix (enabled first if needed).
+            queue: Priority queue class of the 'dijkstra' and 'bidirectional' searches, PriorityQueue or RadixHeap.
 
         Returns:
-            List of code of shortest_path.
+            List of code of shortest_path. None if there is no path.
+        """
+        if self.result_cache is not None:
+            path = self.result_cache.lookup(self.version, ('shortest_path', tuple(cities), method, queue),
+                                            lambda: self._calculate_cached_path(cities, method, queue))
+            return None if path is None else list(path)
+        return self._calculate_shortest_path(cities, method, queue)
+
+
+    def _calculate_cached_path(self, cities, method, queue):
+        """Calculate a shortest path in the immutable form stored in the result cache.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+            method: Shortest path method.
+            queue: Priority queue class.
+
+        Returns:
+            Tuple of code of shortest_path. None if there is no path.
+        """
+        path = self._calculate_shortest_path(cities, method, queue)
+        return None if path is None else tuple(path)
+
+
+    def _calculate_shortest_path(self, cities, method, queue):
+        """Calculate shortest path without the result cache. See calculate_shortest_path.
+
         """
+        if not method in SHORTEST_PATH_METHODS:
+            raise ValueError('Unknown shortest path method: %s' % method)
         departure = self.vertices[cities[0]]
         destination = self.vertices[cities[1]]
+        if self.connectivity is not None and not self.connectivity.may_reach(departure, destination):
+            return None
+
+        if method == 'dijkstra':
+            previous = self._dijkstra(departure, destination, queue)
+            return self._build_path(previous, destination)
+        elif method == 'bidirectional':
+            return self._bidirectional_dijkstra(departure, destination, queue)
+        elif method == 'astar':
+            previous = self._astar(departure, destination)
+            return self._build_path(previous, destination)
+        elif method == 'matrix':
+            return self._current_distance_matrix().path(cities[0], cities[1])
+        elif method == 'ch':
+            if self._contraction_hierarchy is None or self._contraction_hierarchy[0] != self.version:
+                self.build_contraction_hierarchy()
+            return self._contraction_hierarchy[1].calculate_shortest_path(cities)
 
-        pq = PriorityQueue()
+
+    @staticmethod
+    def _dijkstra(departure, destination, queue=PriorityQueue):
+        """Run dijkstra's algorithm from departure until destination is settled.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+            queue: Priority queue class.
+
+        Returns:
+            Dict mapping every discovered vertex to its previous vertex on the shortest path.
+        """
+        pq = queue()
         pq[departure] = 0
+        smallest_distance = {departure: 0}
+        previous = {departure: None}
+        visited_vertices = set()
 
-        smallest_distance = dict()
-        previous = dict()
-        unvisited_vertices = set()
-        for vertex in self.vertices.values():
-            previous[vertex] = None
-            unvisited_vertices.add(vertex)
-            if vertex != departure:
-                smallest_distance[vertex] = sys.maxsize
-            else:
-                smallest_distance[vertex] = 0
-            pq[vertex] = smallest_distance[vertex]
-        
         while pq:
             v = pq.pop_smallest()
-            for neighbor in v.edges.keys():
-                if neighbor in unvisited_vertices:
-                    distance = self.edges[v.code + ',' + neighbor.code].distance
-                    if distance + smallest_distance[v] < smallest_distance[neighbor]:
-                        smallest_distance[neighbor] = distance + smallest_distance[v]
-                        pq[neighbor] = smallest_distance[neighbor]
-                        previous[neighbor] = v
+            if v == destination:
+                break
+            visited_vertices.add(v)
+            for neighbor, edge in v.edges.items():
+                if neighbor in visited_vertices:
+                    continue
+                distance = smallest_distance[v] + edge.distance
+                if not neighbor in smallest_distance or distance < smallest_distance[neighbor]:
+                    smallest_distance[neighbor] = distance
+                    pq[neighbor] = distance
+                    previous[neighbor] = v
 
-            unvisited_vertices.remove(v)
+        return previous
 
-        shortest_path = [destination.code]
+
+    @staticmethod
+    def _build_path(previous, destination):
+        """Rebuild the list of codes of a path from a previous dict.
+
+        Args:
+            previous: Dict mapping vertices to their previous vertex. The departure vertex maps to None.
+            destination: Destination vertex.
+
+        Returns:
+            List of code of the path. None if destination is not in previous.
+        """
+        if not destination in previous:
+            return None
+        path = []
         vertex = destination
-        while vertex != departure:
-            if previous[vertex] == None:
-                shortest_path = None
+        while vertex is not None:
+            path.append(vertex.code)
+            vertex = previous[vertex]
+        path.reverse()
+
+        return path
+
+
+    def _bidirectional_dijkstra(self, departure, destination, queue=PriorityQueue):
+        """Run dijkstra's algorithm forward from departure and backward from destination until the searches meet.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+            queue: Priority queue class.
+
+        Returns:
+            List of code of shortest_path. None if there is no path.
+        """
+        if departure == destination:
+            return [departure.code]
+
+        queues = (queue({departure: 0}), queue({destination: 0}))
+        smallest_distance = ({departure: 0}, {destination: 0})
+        previous = ({departure: None}, {destination: None})
+        visited_vertices = (set(), set())
+        best_distance = None
+        meeting_vertex = None
+
+        while queues[0] and queues[1]:
+            top = [pq[pq.smallest()] for pq in queues]
+            if best_distance is not None and top[0] + top[1] >= best_distance:
                 break
-            else:
-                shortest_path = [previous[vertex].code] + shortest_path
-                vertex = previous[vertex]
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+            v = queues[side].pop_smallest()
+            visited_vertices[side].add(v)
+            adjacency = v.edges if side == 0 else v.in_edges
+            for neighbor, edge in adjacency.items():
+                if neighbor in visited_vertices[side]:
+                    continue
+                distance = smallest_distance[side][v] + edge.distance
+                if not neighbor in smallest_distance[side] or distance < smallest_distance[side][neighbor]:
+                    smallest_distance[side][neighbor] = distance
+                    queues[side][neighbor] = distance
+                    previous[side][neighbor] = v
+                if neighbor in smallest_distance[1 - side]:
+                    total = smallest_distance[side][neighbor] + smallest_distance[1 - side][neighbor]
+                    if best_distance is None or total < best_distance:
+                        best_distance = total
+                        meeting_vertex = neighbor
+
+        if meeting_vertex is None:
+            return None
+        shortest_path = self._build_path(previous[0], meeting_vertex)
+        vertex = previous[1][meeting_vertex]
+        while vertex is not None:
+            shortest_path.append(vertex.code)
+            vertex = previous[1][vertex]
 
         return shortest_path
+
+
+    def calculate_heuristic_scale(self):
+        """Calculate the factor that turns great-circle distances into an admissible lower bound of route distances.
+
+        The factor is the smallest ratio of edge distance to great-circle distance over all edges, so a scaled
+        great-circle distance never exceeds the distance of any route. It is cached until the graph changes.
+
+        Returns:
+            Scale factor. 0 if some vertex has no coordinates.
+        """
+        if self._heuristic_scale is not None and self._heuristic_scale[0] == self.version:
+            return self._heuristic_scale[1]
+
+        scale = None
+        if all(vertex.has_coordinates() for vertex in self.vertices.values()):
+            for edge in self.edges.values():
+                great_circle_distance = edge.departure.great_circle_distance(edge.destination)
+                if great_circle_distance > 0:
+                    ratio = edge.distance / great_circle_distance
+                    if scale is None or ratio < scale:
+                        scale = ratio
+        if scale is None:
+            scale = 0
+        # shrink slightly so floating point error can not make the bound inconsistent
+        scale *= 1 - 1e-9
+        self._heuristic_scale = (self.version, scale)
+
+        return scale
+
+
+    def _astar(self, departure, destination):
+        """Run A* search from departure until destination is settled, guided by the scaled great-circle distance.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+
+        Returns:
+            Dict mapping every discovered vertex to its previous vertex on the shortest path.
+        """
+        scale = self.calculate_heuristic_scale()
+        estimate = dict()
+
+        def heuristic(vertex):
+            if scale == 0:
+                return 0
+            if not vertex in estimate:
+                estimate[vertex] = scale * vertex.great_circle_distance(destination)
+            return estimate[vertex]
+
+        pq = PriorityQueue()
+        pq[departure] = heuristic(departure)
+        smallest_distance = {departure: 0}
+        previous = {departure: None}
+        visited_vertices = set()
+
+        while pq:
+            v = pq.pop_smallest()
+            if v == destination:
+                break
+            visited_vertices.add(v)
+            for neighbor, edge in v.edges.items():
+                if neighbor in visited_vertices:
+                    continue
+                distance = smallest_distance[v] + edge.distance
+                if not neighbor in smallest_distance or distance < smallest_distance[neighbor]:
+                    smallest_distance[neighbor] = distance
+                    pq[neighbor] = distance + heuristic(neighbor)
+                    previous[neighbor] = v
+
+        return previous
+
+
+    def calculate_layover_times(self):
+        """Calculate the layover time at every vertex. They are cached until the graph changes.
+
+        Returns:
+            Dict mapping every vertex to its layover time in hours.
+        """
+        if self._layover_times is None or self._layover_times[0] != self.version:
+            self._layover_times = (self.version, {vertex: layover_time(vertex) for vertex in self.vertices.values()})
+
+        return self._layover_times[1]
+
+
+    def calculate_cheapest_route(self, cities):
+        """Calculate the route with the least total cost given departure vertex and destination vertex.
+
+        The price per km of a leg depends on its index in the route, so the search runs over (vertex, leg index)
+        states. Routes never visit a city twice, so the result is the cheapest of calculate_pareto_routes.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+
+        Returns:
+            List of code of the cheapest route. None if there is no route.
+        """
+        def weight(vertex, edge, leg):
+            return leg_cost(edge.distance, leg)
+
+        return self._leg_search(self.vertices[cities[0]], self.vertices[cities[1]], weight, PAID_LEGS + 1)
+
+
+    def calculate_fastest_route(self, cities):
+        """Calculate the route with the least total time (flight and layover time) given departure vertex and
+        destination vertex.
+
+        The layover time is spent at every vertex the route departs from except the departure vertex, so the search
+        runs over (vertex, first leg or not) states. Routes never visit a city twice.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+
+        Returns:
+            List of code of the fastest route. None if there is no route.
+        """
+        layover_times = self.calculate_layover_times()
+
+        def weight(vertex, edge, leg):
+            if leg == 0:
+                return flight_time(edge.distance)
+            return layover_times[vertex] + flight_time(edge.distance)
+
+        return self._leg_search(self.vertices[cities[0]], self.vertices[cities[1]], weight, 2)
+
+
+    @staticmethod
+    def _leg_search(departure, destination, weight, leg_states):
+        """Search the loopless path with the least total weight when the weight of a leg depends on its index.
+
+        Labels (weight, vertex, leg index, visited vertices) are settled in order of weight like in dijkstra's
+        algorithm, and never extended to a visited vertex. A label is dropped when a settled label of its vertex has
+        the same leg index, no larger weight and visited no other vertices, since every extension of the label extends
+        the settled one as well.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+            weight: Function of departure vertex, edge and leg index returning the non-negative weight of the leg.
+            leg_states: Number of distinct leg indexes. Legs from leg_states - 1 on share the last index.
+
+        Returns:
+            List of code of the path with the least total weight. None if there is no path.
+        """
+        last_leg = leg_states - 1
+
+        def dominated(total, leg, visited, labels):
+            for label in labels:
+                if label[0] <= total and label[3] == leg and not label[4] & ~visited:
+                    return True
+            return False
+
+        # label: (weight, sequence number, vertex, leg index, bitmask of visited vertex ids, previous label)
+        heap = [(0, 0, departure, 0, 1 << departure.id, None)]
+        pushed = 1
+        settled = dict()
+
+        while heap:
+            label = heappop(heap)
+            total, _, v, leg, visited = label[:5]
+            labels = settled.setdefault(v, [])
+            if dominated(total, leg, visited, labels):
+                continue
+            labels.append(label)
+            if v == destination:
+                break
+            next_leg = min(leg + 1, last_leg)
+            for neighbor, edge in v.edges.items():
+                bit = 1 << neighbor.id
+                if visited & bit:
+                    continue
+                next_total = total + weight(v, edge, leg)
+                if dominated(next_total, next_leg, visited | bit, settled.get(neighbor, ())):
+                    continue
+                heappush(heap, (next_total, pushed, neighbor, next_leg, visited | bit, label))
+                pushed += 1
+        else:
+            return None
+
+        path = []
+        while label is not None:
+            path.append(label[2].code)
+            label = label[5]
+        path.reverse()
+
+        return path
+
+
+    def calculate_pareto_routes(self, cities, max_labels=64):
+        """Calculate the Pareto-optimal routes over distance, cost, time and number of hops given departure vertex and
+        destination vertex. Routes never visit a city twice.
+
+        Labels (distance, cost, time, hops) are settled in lexicographic order, so a settled label is never dominated
+        by a later one. A label is dropped when a route to the destination is at least as good in every criterion, or
+        when its vertex already holds max_labels settled labels, or when a settled label of its vertex is at least as
+        good, visited no other cities and pays the same price per km for the next leg. The price per km depends on the
+        leg index, so a route with fewer hops pays more for the same remaining legs and cutting a detour out of a route
+        may make it more expensive.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+            max_labels: Largest number of settled labels per vertex. None for no bound.
+
+        Returns:
+            List of (list of code of the route, distance, cost, time, hops) tuples, shortest first. Cost and time are
+            rounded like calculate_route_info. Empty if there is no route.
+        """
+        departure = self.vertices[cities[0]]
+        destination = self.vertices[cities[1]]
+        layover_times = self.calculate_layover_times()
+
+        def dominated(criteria, routes):
+            for route in routes:
+                if route[0] <= criteria[0] and route[1] <= criteria[1] and route[2] <= criteria[2] and route[3] <= criteria[3]:
+                    return True
+            return False
+
+        def dominated_at_vertex(criteria, visited, labels):
+            leg = min(criteria[3], PAID_LEGS)
+            for label in labels:
+                if (label[0] <= criteria[0] and label[1] <= criteria[1] and label[2] <= criteria[2] and
+                        label[3] <= criteria[3] and min(label[3], PAID_LEGS) == leg and not label[7] & ~visited):
+                    return True
+            return False
+
+        # label: (distance, cost, time, hops, vertex, sequence number, previous label, bitmask of visited vertex ids)
+        heap = [(0, 0, 0, 0, departure, 0, None, 1 << departure.id)]
+        pushed = 1
+        settled = dict()
+        results = []
+
+        while heap:
+            label = heappop(heap)
+            v = label[4]
+            labels = settled.setdefault(v, [])
+            if dominated(label, results) or dominated_at_vertex(label, label[7], labels):
+                continue
+            if max_labels is not None and len(labels) >= max_labels:
+                continue
+            labels.append(label)
+            if v == destination:
+                results.append(label)
+                continue
+            distance, cost, time, hops = label[:4]
+            for neighbor, edge in v.edges.items():
+                bit = 1 << neighbor.id
+                if label[7] & bit:
+                    continue
+                criteria = (distance + edge.distance, cost + leg_cost(edge.distance, hops),
+                            time + flight_time(edge.distance) + (layover_times[v] if hops else 0), hops + 1)
+                visited = label[7] | bit
+                if dominated(criteria, results) or dominated_at_vertex(criteria, visited, settled.get(neighbor, ())):
+                    continue
+                heappush(heap, criteria + (neighbor, pushed, label, visited))
+                pushed += 1
+
+        routes = []
+        for label in results:
+            route = []
+            previous = label
+            while previous is not None:
+                route.append(previous[4].code)
+                previous = previous[6]
+            route.reverse()
+            routes.append((route, label[0], float("%.2f" % label[1]), float("%.2f" % label[2]), label[3]))
+
+        return routes
+
+
+    def calculate_k_shortest_paths(self, cities, k, queue=PriorityQueue):
+        """Calculate the k shortest loopless paths given departure vertex and destination vertex with Yen's algorithm.
+
+        Distances to the destination are computed once with a backward search, and every spur path is searched with
+        them as an exact A* heuristic, so the spur searches only expand vertices close to the result. A path only
+        spurs from the vertices after the one where it left its parent path (Lawler's refinement), as the earlier spurs
+        were searched for the parent already. Edges and vertices are excluded from a spur search with sets, so the
+        graph is never changed.
+
+        Args:
+            cities: List holding code of departure vertex and destination vertex.
+            k: Largest number of paths.
+            queue: Priority queue class of the searches, PriorityQueue or RadixHeap.
+
+        Returns:
+            List of (list of code of the path, distance) tuples, shortest first. Empty if there is no path.
+        """
+        departure = self.vertices[cities[0]]
+        destination = self.vertices[cities[1]]
+        remaining = self._reverse_dijkstra(destination, queue)
+        if k <= 0 or not departure in remaining:
+            return []
+
+        first = self._spur_search(departure, destination, remaining, set(), set(), queue)
+        paths = [(first, remaining[departure], 0)]
+        candidates = []
+        candidate_paths = {tuple(first)}
+        pushed = 0
+
+        while len(paths) < k:
+            path, distance, deviation = paths[-1]
+            root_distance = 0
+            for i in range(len(path) - 1):
+                if i >= deviation:
+                    spur = path[i]
+                    root = path[:i + 1]
+                    banned_vertices = set(root[:-1])
+                    banned_edges = set()
+                    for other, other_distance, other_deviation in paths:
+                        if other[:i + 1] == root:
+                            banned_edges.add((spur, other[i + 1]))
+                    spur_path = self._spur_search(spur, destination, remaining, banned_vertices, banned_edges, queue)
+                    if spur_path is not None:
+                        candidate = root[:-1] + spur_path
+                        if not tuple(candidate) in candidate_paths:
+                            candidate_paths.add(tuple(candidate))
+                            candidate_distance = root_distance + self._path_distance(spur_path)
+                            heappush(candidates, (candidate_distance, pushed, candidate, i))
+                            pushed += 1
+                root_distance += path[i].edges[path[i + 1]].distance
+            if not candidates:
+                break
+            candidate_distance, _, candidate, deviation = heappop(candidates)
+            paths.append((candidate, candidate_distance, deviation))
+
+        return [([vertex.code for vertex in path], distance) for path, distance, deviation in paths]
+
+
+    @staticmethod
+    def _reverse_dijkstra(destination, queue=PriorityQueue):
+        """Run dijkstra's algorithm backward from destination over the whole graph.
+
+        Args:
+            destination: Destination vertex.
+            queue: Priority queue class.
+
+        Returns:
+            Dict mapping every vertex that can reach destination to its shortest distance to destination.
+        """
+        pq = queue()
+        pq[destination] = 0
+        smallest_distance = {destination: 0}
+        visited_vertices = set()
+
+        while pq:
+            v = pq.pop_smallest()
+            visited_vertices.add(v)
+            for neighbor, edge in v.in_edges.items():
+                if neighbor in visited_vertices:
+                    continue
+                distance = smallest_distance[v] + edge.distance
+                if not neighbor in smallest_distance or distance < smallest_distance[neighbor]:
+                    smallest_distance[neighbor] = distance
+                    pq[neighbor] = distance
+
+        return smallest_distance
+
+
+    @staticmethod
+    def _spur_search(departure, destination, remaining, banned_vertices, banned_edges, queue=PriorityQueue):
+        """Run A* search from departure to destination around banned vertices and edges.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+            remaining: Dict mapping vertices to their shortest distance to destination in the whole graph. Vertices
+                missing from it can not reach destination.
+            banned_vertices: Set of vertices the path may not visit.
+            banned_edges: Set of (departure vertex, destination vertex) tuples the path may not use.
+            queue: Priority queue class.
+
+        Returns:
+            List of vertices of the shortest path. None if there is no path.
+        """
+        pq = queue()
+        pq[departure] = remaining[departure]
+        smallest_distance = {departure: 0}
+        previous = {departure: None}
+        visited_vertices = set()
+
+        while pq:
+            v = pq.pop_smallest()
+            if v == destination:
+                path = []
+                while v is not None:
+                    path.append(v)
+                    v = previous[v]
+                path.reverse()
+                return path
+            visited_vertices.add(v)
+            for neighbor, edge in v.edges.items():
+                if neighbor in visited_vertices or neighbor in banned_vertices or not neighbor in remaining:
+                    continue
+                if (v, neighbor) in banned_edges:
+                    continue
+                distance = smallest_distance[v] + edge.distance
+                if not neighbor in smallest_distance or distance < smallest_distance[neighbor]:
+                    smallest_distance[neighbor] = distance
+                    pq[neighbor] = distance + remaining[neighbor]
+                    previous[neighbor] = v
+
+        return None
+
+
+    @staticmethod
+    def _path_distance(path):
+        """Sum the edge distances of a path.
+
+        Args:
+            path: List of vertices.
+
+        Returns:
+            Distance of the path.
+        """
+        return sum(path[i].edges[path[i + 1]].distance for i in range(len(path) - 1))
+
+
+    def calculate_reachable_cities(self, code, budget, metric='time'):
+        """Calculate every city reachable from a departure vertex within a time or distance budget.
+
+        The search expands cities in order of arrival and stops once the next arrival is over the budget. Time counts
+        flight time and the layover time at every city the route departs from except the departure vertex, like
+        calculate_route_info.
+
+        Args:
+            code: Code of departure vertex.
+            budget: Largest total time in hours or total distance.
+            metric: 'time' or 'distance'.
+
+        Returns:
+            Dict mapping code of every reachable city (the departure included) to its smallest arrival time or distance.
+        """
+        return self.calculate_reachable_cities_from([code], budget, metric)[code]
+
+
+    def calculate_reachable_cities_from(self, codes, budget, metric='time'):
+        """Calculate every city reachable within a time or distance budget from each of several departure vertices.
+        The layover times are computed once for all departures.
+
+        Args:
+            codes: List of code of departure vertices.
+            budget: Largest total time in hours or total distance.
+            metric: 'time' or 'distance'.
+
+        Returns:
+            Dict mapping every departure code to a dict mapping code of every reachable city to its smallest arrival
+            time or distance.
+        """
+        if metric == 'time':
+            layover_times = self.calculate_layover_times()
+            flight_times = dict()
+
+            def weight(departure, vertex, edge):
+                if not edge.distance in flight_times:
+                    flight_times[edge.distance] = flight_time(edge.distance)
+                if vertex is departure:
+                    return flight_times[edge.distance]
+                return layover_times[vertex] + flight_times[edge.distance]
+        elif metric == 'distance':
+            def weight(departure, vertex, edge):
+                return edge.distance
+        else:
+            raise ValueError('Unknown reachability metric: %s' % metric)
+
+        reachable = dict()
+        for code in codes:
+            if not code in reachable:
+                reachable[code] = self._bounded_search(self.vertices[code], budget, weight)
+
+        return reachable
+
+
+    @staticmethod
+    def _bounded_search(departure, budget, weight):
+        """Run dijkstra's algorithm from departure until the next settled vertex is over the budget.
+
+        Args:
+            departure: Departure vertex.
+            budget: Largest total weight.
+            weight: Function of departure vertex, vertex and edge returning the non-negative weight of the edge.
+
+        Returns:
+            Dict mapping code of every vertex within the budget to its smallest total weight.
+        """
+        pq = PriorityQueue()
+        pq[departure] = 0
+        smallest_weight = {departure: 0}
+        reachable = dict()
+
+        while pq:
+            v = pq.pop_smallest()
+            total = smallest_weight[v]
+            if total > budget:
+                break
+            reachable[v.code] = total
+            for neighbor, edge in v.edges.items():
+                if neighbor.code in reachable:
+                    continue
+                new_total = total + weight(departure, v, edge)
+                if new_total <= budget and (not neighbor in smallest_weight or new_total < smallest_weight[neighbor]):
+                    smallest_weight[neighbor] = new_total
+                    pq[neighbor] = new_total
+
+        return reachable
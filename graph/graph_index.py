@@ -0,0 +1,61 @@
+class GraphIndex(object):
+    """Graph index base class.
+
+    Base class of structures derived from a Graph object that are kept up to date while the graph changes.
+    A Graph object calls these hooks after each change of its registered indexes. By default every hook does nothing.
+
+    """
+    def rebuild(self, graph):
+        """Called after the graph changed in bulk (e.g. loading a file). The index must not rely on earlier state.
+
+        Args:
+            graph: Graph object.
+        """
+        pass
+
+
+    def vertex_added(self, vertex):
+        """Called after a vertex is added.
+
+        Args:
+            vertex: Added Vertex object.
+        """
+        pass
+
+
+    def vertex_removed(self, vertex):
+        """Called after a vertex is removed. Its edges are reported removed before.
+
+        Args:
+            vertex: Removed Vertex object.
+        """
+        pass
+
+
+    def vertex_edited(self, vertex, old_vertex):
+        """Called after the info of a vertex is edited.
+
+        Args:
+            vertex: Edited Vertex object.
+            old_vertex: JSON object holding vertex info before the edit.
+        """
+        pass
+
+
+    def edge_added(self, edge, replaced_edge):
+        """Called after an edge is added.
+
+        Args:
+            edge: Added Edge object.
+            replaced_edge: Edge object with the same departure and destination that was replaced. None if there was none.
+        """
+        pass
+
+
+    def edge_removed(self, edge):
+        """Called after an edge is removed.
+
+        Args:
+            edge: Removed Edge object.
+        """
+        pass
@@ -0,0 +1,115 @@
+from .graph_index import GraphIndex
+
+GROUP_ATTRIBUTES = ('continent', 'country', 'region')
+
+class GroupIndex(GraphIndex):
+    """Group index object.
+
+    Secondary indexes of vertices by continent, country and region with the total population of every group,
+    and the number of edges between every pair of continents. Updated on every change of the graph.
+
+    """
+    def __init__(self):
+        """Constructor of GroupIndex object.
+
+        """
+        self.rebuild(None)
+
+
+    def rebuild(self, graph):
+        self.vertices = {attribute: dict() for attribute in GROUP_ATTRIBUTES}
+        self.populations = {attribute: dict() for attribute in GROUP_ATTRIBUTES}
+        self.route_counts = dict()
+        if graph is None:
+            return
+        for vertex in graph.vertices.values():
+            self.vertex_added(vertex)
+        for edge in graph.edges.values():
+            self.edge_added(edge, None)
+
+
+    def _add_to_group(self, attribute, value, vertex, population):
+        """Add a vertex to the group of an attribute value.
+
+        Args:
+            attribute: Name of the attribute.
+            value: Value of the attribute.
+            vertex: Vertex object.
+            population: Population counted for the vertex.
+        """
+        self.vertices[attribute].setdefault(value, dict())[vertex.code] = vertex
+        self.populations[attribute][value] = self.populations[attribute].get(value, 0) + population
+
+
+    def _remove_from_group(self, attribute, value, vertex, population):
+        """Remove a vertex from the group of an attribute value. Empty groups are dropped.
+
+        Args:
+            attribute: Name of the attribute.
+            value: Value of the attribute.
+            vertex: Vertex object.
+            population: Population counted for the vertex.
+        """
+        group = self.vertices[attribute][value]
+        del group[vertex.code]
+        if group:
+            self.populations[attribute][value] -= population
+        else:
+            del self.vertices[attribute][value]
+            del self.populations[attribute][value]
+
+
+    def _count_route(self, departure_continent, destination_continent, change):
+        """Change the number of edges between two continents.
+
+        Args:
+            departure_continent: Continent of departure vertex.
+            destination_continent: Continent of destination vertex.
+            change: Change of the number of edges.
+        """
+        key = (departure_continent, destination_continent)
+        count = self.route_counts.get(key, 0) + change
+        if count:
+            self.route_counts[key] = count
+        else:
+            del self.route_counts[key]
+
+
+    def vertex_added(self, vertex):
+        for attribute in GROUP_ATTRIBUTES:
+            self._add_to_group(attribute, getattr(vertex, attribute), vertex, vertex.population)
+
+
+    def vertex_removed(self, vertex):
+        for attribute in GROUP_ATTRIBUTES:
+            self._remove_from_group(attribute, getattr(vertex, attribute), vertex, vertex.population)
+
+
+    def vertex_edited(self, vertex, old_vertex):
+        for attribute in GROUP_ATTRIBUTES:
+            if old_vertex[attribute] == getattr(vertex, attribute):
+                self.populations[attribute][old_vertex[attribute]] += vertex.population - old_vertex['population']
+            else:
+                self._remove_from_group(attribute, old_vertex[attribute], vertex, old_vertex['population'])
+                self._add_to_group(attribute, getattr(vertex, attribute), vertex, vertex.population)
+        if old_vertex['continent'] != vertex.continent:
+            for destination in vertex.edges:
+                if destination is not vertex:
+                    self._count_route(old_vertex['continent'], destination.continent, -1)
+                    self._count_route(vertex.continent, destination.continent, 1)
+            for departure in vertex.in_edges:
+                if departure is not vertex:
+                    self._count_route(departure.continent, old_vertex['continent'], -1)
+                    self._count_route(departure.continent, vertex.continent, 1)
+            if vertex in vertex.edges:
+                self._count_route(old_vertex['continent'], old_vertex['continent'], -1)
+                self._count_route(vertex.continent, vertex.continent, 1)
+
+
+    def edge_added(self, edge, replaced_edge):
+        if replaced_edge is None:
+            self._count_route(edge.departure.continent, edge.destination.continent, 1)
+
+
+    def edge_removed(self, edge):
+        self._count_route(edge.departure.continent, edge.destination.continent, -1)
@@ -0,0 +1,161 @@
+import os
+import json
+from .json_stream import DIRECTED_KEY
+
+# key of the snapshot file holding the sequence number of the last change it includes
+SEQUENCE_KEY = 'journal_sequence'
+
+def write_json_file(graph, addr, extra_fields=None):
+    """Write a Graph object to a file atomically, in the format of the saved network files.
+
+    The graph is written to a temporary file that is synced and then renamed over addr, so addr always holds either
+    the old or the new content.
+
+    Args:
+        graph: Graph object.
+        addr: Saved file address.
+        extra_fields: Dict of additional top-level values. Optional.
+    """
+    temporary_addr = addr + '.tmp'
+    with open(temporary_addr, 'wt') as out:
+        graph.write_json(out, extra_fields=extra_fields)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(temporary_addr, addr)
+
+
+def read_journal(addr):
+    """Read the records of a journal file. A torn last line, left by a crash while appending, is ignored.
+
+    Args:
+        addr: Journal file address.
+
+    Returns:
+        List of records and the length in bytes of the intact part of the file. Empty list and 0 if the file does not
+        exist.
+    """
+    records = []
+    length = 0
+    if not os.path.exists(addr):
+        return records, length
+    with open(addr, 'rb') as file:
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                records.append(json.loads(line.decode('utf-8')))
+            except ValueError:
+                break
+            length += len(line)
+
+    return records, length
+
+
+class ChangeJournal(object):
+    """Change journal object.
+
+    Append-only log of the changes of a Graph object, kept next to a JSON snapshot of the graph (a file in the format
+    of convert_to_json, marked so that every listed route is loaded as one directed edge). Every change is one JSON line [sequence number, change kind, arguments...] where the kind is
+    the name of the Graph method that made it; a batch is a single line holding all of its changes, so it is replayed
+    completely or not at all. Records are buffered and written with one fsync per flush. Compaction writes the whole
+    graph to a fresh snapshot, stamped with the sequence number of the last change, and empties the journal.
+
+    Changes are recorded by the Graph object's mutation methods. Bulk loads are not recorded.
+
+    """
+    def __init__(self, graph, addr, snapshot, flush_every=64, compact_every=4096):
+        """Constructor of ChangeJournal object.
+
+        Args:
+            graph: Graph object whose changes are recorded.
+            addr: Journal file address.
+            snapshot: Snapshot file address.
+            flush_every: Number of buffered records that triggers a flush. None to flush only when flush is called.
+            compact_every: Number of records in the journal file that triggers a compaction after a flush. None to
+                compact only when compact is called.
+        """
+        self.graph = graph
+        self.addr = addr
+        self.snapshot = snapshot
+        self.flush_every = flush_every
+        self.compact_every = compact_every
+        self.sequence = 0
+        self.records = 0
+        self.buffer = []
+
+
+    def __len__(self):
+        return self.records + len(self.buffer)
+
+
+    def append(self, change):
+        """Record a change.
+
+        Args:
+            change: Tuple of change kind and arguments.
+        """
+        self.sequence += 1
+        self.buffer.append(json.dumps([self.sequence] + list(change)))
+        if self.flush_every is not None and len(self.buffer) >= self.flush_every:
+            self.flush()
+
+
+    def flush(self):
+        """Append the buffered records to the journal file and sync it, compacting if the journal grew long enough.
+
+        """
+        if self.buffer:
+            with open(self.addr, 'a') as file:
+                file.write('\n'.join(self.buffer) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+            self.records += len(self.buffer)
+            self.buffer = []
+        if self.compact_every is not None and self.records >= self.compact_every:
+            self.compact()
+
+
+    def compact(self):
+        """Write the graph to a fresh snapshot and empty the journal. Buffered records are included in the snapshot.
+        The snapshot lists every directed edge and is marked as directed, so one-way edges and edges whose distance
+        differs from the reverse edge are restored exactly.
+
+        """
+        # a crash after the snapshot is replaced leaves old records behind, which replay skips by sequence number
+        write_json_file(self.graph, self.snapshot, {SEQUENCE_KEY: self.sequence, DIRECTED_KEY: True})
+        with open(self.addr, 'w') as file:
+            file.flush()
+            os.fsync(file.fileno())
+        self.records = 0
+        self.buffer = []
+
+
+    def replay(self, sequence):
+        """Apply the changes recorded after a snapshot to the graph in one batch and continue the journal after them.
+
+        Args:
+            sequence: Sequence number of the last change included in the snapshot the graph was loaded from.
+
+        Returns:
+            Number of replayed records.
+        """
+        records, length = read_journal(self.addr)
+        if os.path.exists(self.addr) and length < os.path.getsize(self.addr):
+            with open(self.addr, 'r+b') as file:
+                file.truncate(length)
+        self.sequence = sequence
+        self.records = len(records)
+        records = [record for record in records if record[0] > sequence]
+        if not records:
+            return 0
+
+        with self.graph.batch() as batch:
+            for record in records:
+                if record[1] == 'batch':
+                    for change in record[2]:
+                        getattr(batch, change[0])(*change[1:])
+                else:
+                    getattr(batch, record[1])(*record[2:])
+        self.sequence = records[-1][0]
+
+        return len(records)
@@ -0,0 +1,270 @@
+import os
+import json
+import codecs
+from json.encoder import encode_basestring_ascii
+
+WHITESPACE = ' \t\n\r'
+INDENT = '    '
+# top-level key of files whose routes are single directed edges instead of routes flown both ways
+DIRECTED_KEY = 'directed_routes'
+# keys of a metro in sorted order
+METRO_KEYS = ('code', 'continent', 'coordinates', 'country', 'name', 'population', 'region', 'timezone')
+
+class JSONStreamReader(object):
+    """Incremental reader of a JSON object holding arrays.
+
+    Reads a file holding one JSON object in chunks and yields the items of selected top-level arrays one at a time,
+    so only the current chunk and the current item are held in memory. Other top-level values are parsed and dropped.
+
+    """
+    def __init__(self, file, chunk_size=65536, progress=None):
+        """Constructor of JSONStreamReader object.
+
+        Args:
+            file: File object opened in binary mode.
+            chunk_size: Number of bytes read at a time.
+            progress: Function called with (bytes read, total bytes) after every chunk. Optional.
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.bytes_read = 0
+        try:
+            self.total_bytes = os.fstat(file.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            self.total_bytes = None
+
+
+    def _read_chunk(self):
+        """Read the next chunk of the file into the buffer, dropping the consumed part of the buffer.
+
+        Returns:
+            True if data was read. False at the end of the file.
+        """
+        if self.eof:
+            return False
+        data = self.file.read(self.chunk_size)
+        self.bytes_read += len(data)
+        self.buffer = self.buffer[self.position:] + self.text_decoder.decode(data, final=not data)
+        self.position = 0
+        if not data:
+            self.eof = True
+        if self.progress is not None:
+            self.progress(self.bytes_read, self.total_bytes)
+
+        return bool(data)
+
+
+    def _peek(self):
+        """Skip whitespace and return the next character without consuming it.
+
+        Returns:
+            Next character. Empty string at the end of the file.
+        """
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read_chunk():
+                return ''
+
+
+    def _expect(self, characters):
+        """Consume the next non-whitespace character, which must be one of characters.
+
+        Args:
+            characters: String of accepted characters.
+
+        Returns:
+            The consumed character.
+        """
+        character = self._peek()
+        if character == '' or not character in characters:
+            raise ValueError('Expected one of %r at byte %d, found %r' % (characters, self.bytes_read, character))
+        self.position += 1
+
+        return character
+
+
+    def _decode_value(self):
+        """Decode the next JSON value, reading more chunks until it is complete.
+
+        Returns:
+            The decoded value.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._read_chunk():
+                    raise
+                continue
+            # a number or literal ending at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._read_chunk():
+                continue
+            self.position = end
+            return value
+
+
+    def iter_items(self, keys):
+        """Iterate over the items of the top-level arrays with the given keys, in file order. A selected key holding
+        another value yields the value as its only item.
+
+        Args:
+            keys: Collection of keys of the arrays to stream.
+
+        Returns:
+            Iterator of (key, item) tuples.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if key in keys and self._peek() == '[':
+                self._expect('[')
+                if self._peek() == ']':
+                    self.position += 1
+                else:
+                    while True:
+                        yield key, self._decode_value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                value = self._decode_value()
+                if key in keys:
+                    yield key, value
+            if self._expect(',}') == '}':
+                return
+
+
+def iter_json_items(addr, keys, chunk_size=65536, progress=None):
+    """Stream the items of the top-level arrays with the given keys from a file containing a JSON object.
+
+    Args:
+        addr: Loaded file address.
+        keys: Collection of keys of the arrays to stream.
+        chunk_size: Number of bytes read at a time.
+        progress: Function called with (bytes read, total bytes) after every chunk. Optional.
+
+    Returns:
+        Iterator of (key, item) tuples.
+    """
+    with open(addr, 'rb') as file:
+        for key, item in JSONStreamReader(file, chunk_size, progress).iter_items(keys):
+            yield key, item
+
+
+def encode_value(value, level):
+    """Encode a JSON value the way json.dump(..., sort_keys=True, indent=4, separators=(',', ': ')) does.
+
+    Args:
+        value: JSON value.
+        level: Indentation level of the line the value starts on.
+
+    Returns:
+        JSON text.
+    """
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    if type(value) is int:
+        return int.__repr__(value)
+    if type(value) is dict and value and all(type(key) is str for key in value):
+        separator = '\n' + INDENT * (level + 1)
+        return '{' + separator + (',' + separator).join(
+            encode_basestring_ascii(key) + ': ' + encode_value(value[key], level + 1) for key in sorted(value)) + \
+            '\n' + INDENT * level + '}'
+    return json.dumps(value, sort_keys=True, indent=4, separators=(',', ': ')).replace('\n', '\n' + INDENT * level)
+
+
+def encode_metro(vertex):
+    """Encode the info of a vertex as an item of the metros array.
+
+    Args:
+        vertex: Vertex object.
+
+    Returns:
+        JSON text.
+    """
+    item = INDENT * 3
+    return INDENT * 2 + '{\n' + ',\n'.join(
+        item + '"' + key + '": ' + encode_value(getattr(vertex, key), 3) for key in METRO_KEYS) + '\n' + INDENT * 2 + '}'
+
+
+def encode_route(departure, destination, distance):
+    """Encode an edge as an item of the routes array.
+
+    Args:
+        departure: Departure vertex.
+        destination: Destination vertex.
+        distance: Distance of the edge.
+
+    Returns:
+        JSON text.
+    """
+    return '%s{\n%s"distance": %s,\n%s"ports": [\n%s%s,\n%s%s\n%s]\n%s}' % (
+        INDENT * 2, INDENT * 3, encode_value(distance, 3), INDENT * 3, INDENT * 4,
+        encode_basestring_ascii(departure.code), INDENT * 4, encode_basestring_ascii(destination.code), INDENT * 3,
+        INDENT * 2)
+
+
+def write_graph_json(graph, out, sort=True, chunk_size=1024, extra_fields=None):
+    """Write a Graph object to a file object as JSON, item by item.
+
+    The text is the same as json.dump(graph.convert_to_json(), out, sort_keys=True, indent=4, separators=(',', ': '))
+    but the JSON object is never built: metros and routes are encoded straight from the vertices and edges and written
+    in chunks. Routes are listed per departure in the order of the metros.
+
+    Args:
+        graph: Graph object.
+        out: File object opened in text mode.
+        sort: List metros by code and routes by departure and destination code. False to keep the stored order, which
+            is faster but not the order of convert_to_json.
+        chunk_size: Number of metros or routes written at a time.
+        extra_fields: Dict of additional top-level values, e.g. {'journal_sequence': 3}. Optional.
+    """
+    fields = dict(extra_fields) if extra_fields else dict()
+    fields['metros'] = None
+    fields['routes'] = None
+    vertices = graph.sorted_vertices() if sort else list(graph.vertices.values())
+
+    def routes():
+        for vertex in vertices:
+            if sort:
+                for destination in sorted(vertex.edges, key=lambda destination: destination.code):
+                    yield encode_route(vertex, destination, vertex.edges[destination].distance)
+            else:
+                for destination, edge in vertex.edges.items():
+                    yield encode_route(vertex, destination, edge.distance)
+
+    out.write('{')
+    for position, key in enumerate(sorted(fields)):
+        out.write('%s\n%s%s: ' % (',' if position else '', INDENT, encode_basestring_ascii(key)))
+        if key == 'metros':
+            items = map(encode_metro, vertices)
+        elif key == 'routes':
+            items = routes()
+        else:
+            out.write(encode_value(fields[key], 1))
+            continue
+        chunk = []
+        written = False
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                out.write(('[\n' if not written else ',\n') + ',\n'.join(chunk))
+                written = True
+                chunk = []
+        if chunk:
+            out.write(('[\n' if not written else ',\n') + ',\n'.join(chunk))
+            written = True
+        out.write('\n' + INDENT + ']' if written else '[]')
+    out.write('\n}')
@@ -0,0 +1,247 @@
+from heapq import heapify, heappush, heappop
+from .graph_index import GraphIndex
+
+class OrderedGroups(object):
+    """Ordered groups object.
+
+    Items grouped by a numeric key, with the smallest and largest key available in O(log n).
+    Empty groups are dropped right away and their keys are removed lazily from two heaps. Like PriorityQueue, the heaps
+    are rebuilt when they hold more than twice as many keys as there are groups.
+
+    """
+    def __init__(self):
+        """Constructor of OrderedGroups object.
+
+        """
+        self.groups = dict()
+        self._min_heap = []
+        self._max_heap = []
+
+
+    def add(self, key, item_key, item):
+        """Add an item to the group of a key.
+
+        Args:
+            key: Group key.
+            item_key: Key of the item within its group.
+            item: Item.
+        """
+        if not key in self.groups:
+            self.groups[key] = dict()
+            if len(self._min_heap) < 2 * len(self.groups):
+                heappush(self._min_heap, key)
+                heappush(self._max_heap, -key)
+            else:
+                self._rebuild_heaps()
+        self.groups[key][item_key] = item
+
+
+    def remove(self, key, item_key):
+        """Remove an item from the group of a key.
+
+        Args:
+            key: Group key.
+            item_key: Key of the item within its group.
+        """
+        group = self.groups[key]
+        del group[item_key]
+        if not group:
+            del self.groups[key]
+
+
+    def _rebuild_heaps(self):
+        self._min_heap = list(self.groups)
+        self._max_heap = [-key for key in self.groups]
+        heapify(self._min_heap)
+        heapify(self._max_heap)
+
+
+    def min_key(self):
+        """Get the smallest key.
+
+        Returns:
+            Smallest key. None if there are no items.
+        """
+        heap = self._min_heap
+        while heap and not heap[0] in self.groups:
+            heappop(heap)
+        return heap[0] if heap else None
+
+
+    def max_key(self):
+        """Get the largest key.
+
+        Returns:
+            Largest key. None if there are no items.
+        """
+        heap = self._max_heap
+        while heap and not -heap[0] in self.groups:
+            heappop(heap)
+        return -heap[0] if heap else None
+
+
+    def group(self, key):
+        """Get the items of a key in insertion order.
+
+        Args:
+            key: Group key.
+
+        Returns:
+            List of items. Empty if key is None or has no items.
+        """
+        if key is None or not key in self.groups:
+            return []
+        return list(self.groups[key].values())
+
+
+class NetworkStatistics(GraphIndex):
+    """Network statistics object.
+
+    Running sums and counts of edge distances and vertex populations, and edges, vertices and out-degrees grouped
+    by value. Updated on every change of the graph, so the summary queries of Graph need no scan.
+
+    """
+    def __init__(self):
+        """Constructor of NetworkStatistics object.
+
+        """
+        self.rebuild(None)
+
+
+    def rebuild(self, graph):
+        self.distance_sum = 0
+        self.edge_count = 0
+        self.population_sum = 0
+        self.vertex_count = 0
+        self.distances = OrderedGroups()
+        self.populations = OrderedGroups()
+        self.degrees = OrderedGroups()
+        self._degree = dict()
+        if graph is None:
+            return
+        for vertex in graph.vertices.values():
+            self.vertex_added(vertex)
+        for edge in graph.edges.values():
+            self.edge_added(edge, None)
+
+
+    def vertex_added(self, vertex):
+        self.population_sum += vertex.population
+        self.vertex_count += 1
+        self.populations.add(vertex.population, vertex, vertex)
+        self._degree[vertex] = 0
+        self.degrees.add(0, vertex, vertex)
+
+
+    def vertex_removed(self, vertex):
+        self.population_sum -= vertex.population
+        self.vertex_count -= 1
+        self.populations.remove(vertex.population, vertex)
+        self.degrees.remove(self._degree.pop(vertex), vertex)
+
+
+    def vertex_edited(self, vertex, old_vertex):
+        self.population_sum += vertex.population - old_vertex['population']
+        self.populations.remove(old_vertex['population'], vertex)
+        self.populations.add(vertex.population, vertex, vertex)
+
+
+    def _change_degree(self, vertex, change):
+        """Move a vertex to the group of its new out-degree.
+
+        Args:
+            vertex: Vertex object.
+            change: Change of the out-degree.
+        """
+        degree = self._degree[vertex]
+        self.degrees.remove(degree, vertex)
+        self._degree[vertex] = degree + change
+        self.degrees.add(degree + change, vertex, vertex)
+
+
+    def edge_added(self, edge, replaced_edge):
+        key = (edge.departure.id, edge.destination.id)
+        if replaced_edge is not None:
+            self.distance_sum -= replaced_edge.distance
+            self.distances.remove(replaced_edge.distance, key)
+        else:
+            self.edge_count += 1
+            self._change_degree(edge.departure, 1)
+        self.distance_sum += edge.distance
+        self.distances.add(edge.distance, key, edge)
+
+
+    def edge_removed(self, edge):
+        self.distance_sum -= edge.distance
+        self.edge_count -= 1
+        self.distances.remove(edge.distance, (edge.departure.id, edge.destination.id))
+        self._change_degree(edge.departure, -1)
+
+
+    def longest_edges(self):
+        """Get the longest edges.
+
+        Returns:
+            Edge list with largest distance.
+        """
+        return self.distances.group(self.distances.max_key())
+
+
+    def shortest_edges(self):
+        """Get the shortest edges.
+
+        Returns:
+            Edge list with smallest distance.
+        """
+        return self.distances.group(self.distances.min_key())
+
+
+    def average_distance(self):
+        """Get the average edge distance.
+
+        Returns:
+            Average edge distance.
+        """
+        return self.distance_sum / self.edge_count
+
+
+    def biggest_vertex(self):
+        """Get the biggest vertex (by population). Ties go to the vertex that got its population first.
+
+        Returns:
+            Vertex with most population. None if no vertex has a positive population.
+        """
+        population = self.populations.max_key()
+        if population is None or population <= 0:
+            return None
+        return self.populations.group(population)[0]
+
+
+    def smallest_vertex(self):
+        """Get the smallest vertex (by population). Ties go to the vertex that got its population first.
+
+        Returns:
+            Vertex with least population. None if there are no vertices.
+        """
+        population = self.populations.min_key()
+        if population is None:
+            return None
+        return self.populations.group(population)[0]
+
+
+    def average_vertex_size(self):
+        """Get the average vertex size.
+
+        Returns:
+            Average vertex size.
+        """
+        return self.population_sum / self.vertex_count
+
+
+    def hub_vertices(self):
+        """Get the vertices with most direct connections.
+
+        Returns:
+            List of vertices with most direct connections.
+        """
+        return self.degrees.group(self.degrees.max_key())
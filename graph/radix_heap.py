@@ -0,0 +1,123 @@
+class RadixHeap(dict):
+    """Dictionary that can be used as a monotone priority queue with non-negative integer priorities.
+
+    Drop-in replacement of PriorityQueue for searches whose popped priorities never decrease, like dijkstra's algorithm
+    over integer distances. Keys (e.g. vertices or integer vertex ids) are never compared. An item with priority p is
+    kept in bucket (p XOR last popped priority).bit_length(), so bucket 0 holds the items with the smallest priority.
+    When it runs empty, the items of the next non-empty bucket are spread over the lower buckets, and every item moves
+    down at most once per bit of its priority.
+
+    Like PriorityQueue, updated priorities leave stale entries behind that are dropped lazily, and the buckets are
+    rebuilt when they hold more than twice as many entries as there are items.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(RadixHeap, self).__init__(*args, **kwargs)
+        self._last = 0
+        self._rebuild_buckets()
+
+    def _rebuild_buckets(self):
+        self._buckets = [[] for i in range(65)]
+        self._filled = 0 # bit i is set if bucket i > 0 may hold entries
+        self._entries = 0
+        for key, val in self.items():
+            self._push(val, key)
+
+    def _push(self, val, key):
+        if val < self._last:
+            raise ValueError('Priority %s is smaller than the last popped priority %s' % (val, self._last))
+        i = (val ^ self._last).bit_length()
+        while len(self._buckets) <= i:
+            self._buckets.append([])
+        self._buckets[i].append((val, key))
+        self._filled |= 1 << i
+        self._entries += 1
+
+    def _fill_first_bucket(self):
+        """Move the items with the smallest priority into bucket 0.
+
+        Raises IndexError if the object is empty.
+        """
+        buckets = self._buckets
+        get = self.get
+        filled = self._filled & ~1
+        while filled:
+            i = (filled & -filled).bit_length() - 1
+            filled &= ~(1 << i)
+            bucket = buckets[i]
+            buckets[i] = []
+            self._entries -= len(bucket)
+            entries = [entry for entry in bucket if get(entry[1]) == entry[0]]
+            if entries:
+                last = self._last = min(entries, key=_priority)[0]
+                for entry in entries:
+                    j = (entry[0] ^ last).bit_length()
+                    buckets[j].append(entry)
+                    filled |= 1 << j
+                self._filled = filled
+                self._entries += len(entries)
+                return
+        self._filled = 0
+        raise IndexError('RadixHeap is empty')
+
+    def smallest(self):
+        """Return the item with the lowest priority.
+
+        Raises IndexError if the object is empty.
+        """
+        first = self._buckets[0]
+        while True:
+            if not first:
+                self._fill_first_bucket()
+            val, key = first[-1]
+            if self.get(key) == val:
+                return key
+            first.pop()
+            self._entries -= 1
+
+    def pop_smallest(self):
+        """Return the item with the lowest priority and remove it.
+
+        Raises IndexError if the object is empty.
+        """
+        first = self._buckets[0]
+        while True:
+            if not first:
+                self._fill_first_bucket()
+            val, key = first.pop()
+            self._entries -= 1
+            if self.get(key) == val:
+                del self[key]
+                return key
+
+    def __setitem__(self, key, val):
+        super(RadixHeap, self).__setitem__(key, val)
+
+        if self._entries < 2 * len(self):
+            self._push(val, key)
+        else:
+            # Like PriorityQueue, rebuild the buckets once stale entries take more than half of them.
+            self._rebuild_buckets()
+
+    def setdefault(self, key, val):
+        if key not in self:
+            self[key] = val
+            return val
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        super(RadixHeap, self).update(*args, **kwargs)
+        self._rebuild_buckets()
+
+    def sorted_iter(self):
+        """Sorted iterator of the priority dictionary items.
+
+        Beware: this will destroy elements as they are returned.
+        """
+
+        while self:
+            yield self.pop_smallest()
+
+
+def _priority(entry):
+    return entry[0]
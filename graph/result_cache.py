@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+class ResultCache(object):
+    """Result cache object.
+
+    Bounded least recently used cache of query results keyed by query arguments. Results are valid for one graph
+    version only: the first lookup after the version changed drops every entry, so an outdated result is never
+    returned.
+
+    """
+    def __init__(self, size=1024):
+        """Constructor of ResultCache object.
+
+        Args:
+            size: Largest number of results kept.
+        """
+        self.size = size
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def lookup(self, version, key, calculate):
+        """Get the result of a query, calculating and storing it if it is not cached.
+
+        Args:
+            version: Current version of the graph.
+            key: Hashable query arguments.
+            calculate: Function without arguments calculating the result. Exceptions are passed on and not cached.
+
+        Returns:
+            The result.
+        """
+        if version != self.version:
+            if self.entries:
+                self.entries.clear()
+                self.invalidations += 1
+            self.version = version
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        result = calculate()
+        self.entries[key] = result
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+        return result
+
+
+    def clear(self):
+        """Drop every cached result. Counters are kept.
+
+        """
+        self.entries.clear()
+
+
+    def counters(self):
+        """Get the counters of the cache.
+
+        Returns:
+            A dict holding the number of hits, misses, evictions and invalidations and the current size.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'invalidations': self.invalidations, 'size': len(self.entries)}
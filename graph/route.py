@@ -0,0 +1,197 @@
+from collections.abc import Mapping
+from .edge import Edge
+
+FORWARD = 1
+BACKWARD = 2
+
+class Route(object):
+    """Route class.
+
+    Undirected route object that stores both ports, one shared distance and which of the two directions are flown.
+    The first port is the one with the smaller vertex id. Vertex edge dictionaries hold the route itself for every
+    direction that is flown, so the route also answers to distance like an Edge object.
+
+    """
+    __slots__ = ('ports', 'distance', 'directions')
+
+    def __init__(self, first, second, distance):
+        """Constructor of Route object. No direction is flown yet.
+
+        Args:
+            first: Port vertex with the smaller id.
+            second: Port vertex with the larger id.
+            distance: Distance.
+        """
+        self.ports = (first, second)
+        self.distance = distance
+        self.directions = 0
+
+
+    def direction(self, departure):
+        """Get the direction flag of the direction starting at a port.
+
+        Args:
+            departure: Port vertex the direction starts from.
+
+        Returns:
+            FORWARD or BACKWARD.
+        """
+        return FORWARD if departure is self.ports[0] else BACKWARD
+
+
+    def edge(self, departure):
+        """Get a directed view of the route.
+
+        Args:
+            departure: Port vertex the direction starts from.
+
+        Returns:
+            Edge object from departure to the other port.
+        """
+        destination = self.ports[1] if departure is self.ports[0] else self.ports[0]
+        return Edge(departure, destination, self.distance)
+
+
+    def directed_edges(self):
+        """Get directed views of all flown directions.
+
+        Returns:
+            List of Edge objects.
+        """
+        edges = []
+        if self.directions & FORWARD:
+            edges.append(self.edge(self.ports[0]))
+        if self.directions & BACKWARD:
+            edges.append(self.edge(self.ports[1]))
+        return edges
+
+
+    def count(self):
+        """Count flown directions.
+
+        Returns:
+            0, 1 or 2.
+        """
+        return (self.directions & FORWARD) + (self.directions >> 1)
+
+
+class SymmetricEdges(Mapping):
+    """Directed view of routes stored once per pair of vertices.
+
+    Mapping from (departure id, destination id) to Edge objects like Graph.edges, backed by a dict of Route objects
+    keyed by (smaller id, larger id). Edge objects are created on access.
+
+    """
+    def __init__(self):
+        """Constructor of SymmetricEdges object.
+
+        """
+        self.routes = dict()
+        self._count = 0
+
+
+    @staticmethod
+    def route_key(departure, destination):
+        """Get the key of the route between two vertices.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+
+        Returns:
+            Tuple of smaller and larger vertex id.
+        """
+        if departure.id <= destination.id:
+            return (departure.id, destination.id)
+        return (destination.id, departure.id)
+
+
+    def _find(self, key):
+        """Find the route and direction flag of a directed edge key.
+
+        Args:
+            key: Tuple of departure id and destination id.
+
+        Returns:
+            Route object and direction flag. Route is None if the direction is not flown.
+        """
+        departure, destination = key
+        if departure <= destination:
+            route = self.routes.get((departure, destination))
+            direction = FORWARD
+        else:
+            route = self.routes.get((destination, departure))
+            direction = BACKWARD
+        if route is None or not route.directions & direction:
+            return None, direction
+        return route, direction
+
+
+    def __getitem__(self, key):
+        route, direction = self._find(key)
+        if route is None:
+            raise KeyError(key)
+        return route.edge(route.ports[0] if direction == FORWARD else route.ports[1])
+
+
+    def __contains__(self, key):
+        return self._find(key)[0] is not None
+
+
+    def __iter__(self):
+        for (first, second), route in list(self.routes.items()):
+            if route.directions & FORWARD:
+                yield (first, second)
+            if route.directions & BACKWARD:
+                yield (second, first)
+
+
+    def __len__(self):
+        return self._count
+
+
+    def add(self, departure, destination, distance):
+        """Fly a direction of a route, creating the route if needed. The distance is shared by both directions.
+
+        Args:
+            departure: Departure vertex.
+            destination: Destination vertex.
+            distance: Distance of the route.
+
+        Returns:
+            The Route object.
+        """
+        key = self.route_key(departure, destination)
+        route = self.routes.get(key)
+        if route is None:
+            if departure.id <= destination.id:
+                route = Route(departure, destination, distance)
+            else:
+                route = Route(destination, departure, distance)
+            self.routes[key] = route
+        route.distance = distance
+        direction = route.direction(departure)
+        if not route.directions & direction:
+            route.directions |= direction
+            self._count += 1
+        return route
+
+
+    def pop(self, key):
+        """Stop flying one direction of a route. The route is dropped once neither direction is flown.
+
+        Args:
+            key: Tuple of departure id and destination id.
+
+        Returns:
+            Edge object of the removed direction.
+        """
+        route, direction = self._find(key)
+        if route is None:
+            raise KeyError(key)
+        edge = route.edge(route.ports[0] if direction == FORWARD else route.ports[1])
+        route.directions &= ~direction
+        self._count -= 1
+        if route.directions == 0:
+            del self.routes[(key[0], key[1]) if direction == FORWARD else (key[1], key[0])]
+        return edge
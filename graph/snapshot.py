@@ -0,0 +1,229 @@
+import json
+import mmap
+import math
+import struct
+from array import array
+from .csr_graph import CSRGraph
+
+MAGIC = b'CSAIRSNP'
+FORMAT_VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+# magic, format version, byte order mark, vertex count, edge count, string count, string blob size
+HEADER = struct.Struct('=8sIIQQQQ')
+TIMEZONE_IS_INT = 1
+
+def _align(offset):
+    """Round an offset up to a multiple of 8 bytes.
+
+    Args:
+        offset: Byte offset.
+
+    Returns:
+        Aligned byte offset.
+    """
+    return (offset + 7) & ~7
+
+
+def _sections(vertex_count, edge_count, string_count, blob_size):
+    """Calculate the layout of a snapshot file.
+
+    Args:
+        vertex_count: Number of vertices.
+        edge_count: Number of edges.
+        string_count: Number of strings in the string table.
+        blob_size: Size in bytes of the string table text.
+
+    Returns:
+        List of (name, typecode, item count, byte offset) tuples in file order, and the total file size.
+    """
+    layout = [
+        ('string_offsets', 'q', string_count + 1),
+        ('code', 'I', vertex_count),
+        ('name', 'I', vertex_count),
+        ('country', 'I', vertex_count),
+        ('continent', 'I', vertex_count),
+        ('coordinates', 'I', vertex_count),
+        ('population', 'q', vertex_count),
+        ('region', 'q', vertex_count),
+        ('timezone', 'd', vertex_count),
+        ('latitude', 'd', vertex_count),
+        ('longitude', 'd', vertex_count),
+        ('flags', 'B', vertex_count),
+        ('offsets', 'q', vertex_count + 1),
+        ('targets', 'q', edge_count),
+        ('distances', 'q', edge_count),
+        ('blob', 'B', blob_size),
+    ]
+    sections = []
+    offset = _align(HEADER.size)
+    for name, typecode, count in layout:
+        sections.append((name, typecode, count, offset))
+        offset = _align(offset + count * array(typecode).itemsize)
+
+    return sections, offset
+
+
+def write_snapshot(graph, addr):
+    """Write a Graph object to the specified file in the binary snapshot format.
+
+    The file holds a header, a string table for codes, names, countries, continents and coordinates, fixed-width vertex
+    columns in code order and the edges in compressed sparse row arrays.
+
+    Args:
+        graph: Graph object.
+        addr: Written file address.
+    """
+    csr = CSRGraph.from_graph(graph)
+    strings = []
+    string_ids = dict()
+
+    def intern(text):
+        if not text in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text)
+        return string_ids[text]
+
+    columns = dict()
+    for name in ('code', 'name', 'country', 'continent', 'coordinates'):
+        columns[name] = array('I')
+    for name in ('population', 'region'):
+        columns[name] = array('q')
+    for name in ('timezone', 'latitude', 'longitude'):
+        columns[name] = array('d')
+    columns['flags'] = array('B')
+    for code in csr.codes:
+        metro = graph.vertices[code].to_json()
+        for name in ('code', 'name', 'country', 'continent'):
+            columns[name].append(intern(metro[name]))
+        columns['coordinates'].append(intern(json.dumps(metro['coordinates'])))
+        columns['population'].append(metro['population'])
+        columns['region'].append(metro['region'])
+        columns['timezone'].append(metro['timezone'])
+        vertex = graph.vertices[code]
+        columns['latitude'].append(vertex.latitude if vertex.latitude is not None else math.nan)
+        columns['longitude'].append(vertex.longitude if vertex.longitude is not None else math.nan)
+        columns['flags'].append(TIMEZONE_IS_INT if isinstance(metro['timezone'], int) else 0)
+
+    encoded = [text.encode('utf-8') for text in strings]
+    columns['string_offsets'] = array('q', [0])
+    for data in encoded:
+        columns['string_offsets'].append(columns['string_offsets'][-1] + len(data))
+    columns['blob'] = b''.join(encoded)
+    columns['offsets'] = csr.offsets
+    columns['targets'] = csr.targets
+    columns['distances'] = csr.distances
+
+    sections, size = _sections(len(csr), csr.edge_count(), len(strings), len(columns['blob']))
+    with open(addr, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, len(csr), csr.edge_count(), len(strings), len(columns['blob'])))
+        for name, typecode, count, offset in sections:
+            data = columns[name] if isinstance(columns[name], bytes) else columns[name].tobytes()
+            out.write(b'\0' * (offset - out.tell()))
+            out.write(data)
+        out.write(b'\0' * (size - out.tell()))
+
+
+class GraphSnapshot(object):
+    """Graph snapshot object.
+
+    Read-only view of a binary snapshot file mapped into memory. Opening only maps the file and checks the header;
+    columns are typed memoryviews over the mapping and strings are decoded when they are accessed.
+
+    """
+    def __init__(self, addr):
+        """Constructor of GraphSnapshot object. Maps the specified snapshot file into memory.
+
+        Args:
+            addr: Snapshot file address.
+        """
+        with open(addr, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order_mark, vertex_count, edge_count, string_count, blob_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError('Not a graph snapshot file: %s' % addr)
+        if byte_order_mark != BYTE_ORDER_MARK:
+            self._mmap.close()
+            raise ValueError('Graph snapshot was written with a different byte order: %s' % addr)
+        self.vertex_count = vertex_count
+        self.edge_count = edge_count
+        sections, size = _sections(vertex_count, edge_count, string_count, blob_size)
+        self._view = memoryview(self._mmap)
+        self.columns = dict()
+        for name, typecode, count, offset in sections:
+            self.columns[name] = self._view[offset:offset + count * array(typecode).itemsize].cast(typecode)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def close(self):
+        """Release the memory mapping. Views obtained from the snapshot must not be used afterwards.
+
+        """
+        for column in self.columns.values():
+            column.release()
+        self.columns = dict()
+        self._view.release()
+        self._mmap.close()
+
+
+    def string(self, i):
+        """Decode a string of the string table.
+
+        Args:
+            i: Index of the string.
+
+        Returns:
+            The string.
+        """
+        offsets = self.columns['string_offsets']
+        return bytes(self.columns['blob'][offsets[i]:offsets[i + 1]]).decode('utf-8')
+
+
+    def codes(self):
+        """Decode the codes of all vertices.
+
+        Returns:
+            List of vertex codes, indexed by vertex id.
+        """
+        return [self.string(i) for i in self.columns['code']]
+
+
+    def vertex_json(self, v):
+        """Build the JSON object holding the info of a vertex.
+
+        Args:
+            v: Id of the vertex.
+
+        Returns:
+            A JSON object holding vertex info.
+        """
+        columns = self.columns
+        metro = dict()
+        metro['code'] = self.string(columns['code'][v])
+        metro['name'] = self.string(columns['name'][v])
+        metro['country'] = self.string(columns['country'][v])
+        metro['continent'] = self.string(columns['continent'][v])
+        timezone = columns['timezone'][v]
+        metro['timezone'] = int(timezone) if columns['flags'][v] & TIMEZONE_IS_INT else timezone
+        metro['coordinates'] = json.loads(self.string(columns['coordinates'][v]))
+        metro['population'] = columns['population'][v]
+        metro['region'] = columns['region'][v]
+
+        return metro
+
+
+    def to_csr(self):
+        """Build a CSRGraph object whose arrays are views of the snapshot.
+
+        Returns:
+            CSRGraph object.
+        """
+        columns = self.columns
+        return CSRGraph(self.codes(), columns['offsets'], columns['targets'], columns['distances'], columns['population'])
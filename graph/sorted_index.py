@@ -0,0 +1,163 @@
+import math
+from bisect import bisect_left, bisect_right, insort
+from .graph_index import GraphIndex
+
+class SortedValues(object):
+    """Sorted values object.
+
+    Items kept sorted by (value, key) in a list, so top-k, range and percentile queries are a binary search plus
+    a slice. Items are found again by key when their value changes or they are removed.
+
+    """
+    def __init__(self):
+        """Constructor of SortedValues object.
+
+        """
+        self.entries = []
+        self.items = dict()
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def add(self, value, key, item):
+        """Add an item.
+
+        Args:
+            value: Sorting value.
+            key: Unique and comparable key of the item, used to break ties.
+            item: Item.
+        """
+        insort(self.entries, (value, key))
+        self.items[key] = item
+
+
+    def remove(self, value, key):
+        """Remove an item.
+
+        Args:
+            value: Sorting value the item was added with.
+            key: Key of the item.
+        """
+        del self.entries[bisect_left(self.entries, (value, key))]
+        del self.items[key]
+
+
+    def largest(self, k):
+        """Get the items with the largest values.
+
+        Args:
+            k: Number of items.
+
+        Returns:
+            List of at most k items, largest first.
+        """
+        if k <= 0:
+            return []
+        return [self.items[key] for value, key in reversed(self.entries[-k:])]
+
+
+    def smallest(self, k):
+        """Get the items with the smallest values.
+
+        Args:
+            k: Number of items.
+
+        Returns:
+            List of at most k items, smallest first.
+        """
+        return [self.items[key] for value, key in self.entries[:max(k, 0)]]
+
+
+    def within(self, minimum, maximum):
+        """Get the items with values in a range.
+
+        Args:
+            minimum: Smallest accepted value.
+            maximum: Largest accepted value.
+
+        Returns:
+            List of items with minimum <= value <= maximum, smallest first.
+        """
+        values = _ValueView(self.entries)
+        start = bisect_left(values, minimum)
+        end = bisect_right(values, maximum)
+        return [self.items[key] for value, key in self.entries[start:end]]
+
+
+    def percentile(self, percent):
+        """Get the value at a percentile with the nearest-rank method.
+
+        Args:
+            percent: Percentile between 0 and 100.
+
+        Returns:
+            The value. None if there are no items.
+        """
+        if not self.entries:
+            return None
+        rank = max(1, math.ceil(percent / 100 * len(self.entries)))
+        return self.entries[min(rank, len(self.entries)) - 1][0]
+
+
+class _ValueView(object):
+    """Sequence of the values of (value, key) entries, for bisecting by value only.
+
+    """
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, i):
+        return self.entries[i][0]
+
+
+class SortedIndex(GraphIndex):
+    """Sorted index object.
+
+    Edges sorted by distance and vertices sorted by population, kept in sync with changes of the graph.
+
+    """
+    def __init__(self):
+        """Constructor of SortedIndex object.
+
+        """
+        self.rebuild(None)
+
+
+    def rebuild(self, graph):
+        self.distances = SortedValues()
+        self.populations = SortedValues()
+        if graph is None:
+            return
+        for vertex in graph.vertices.values():
+            self.vertex_added(vertex)
+        for edge in graph.edges.values():
+            self.edge_added(edge, None)
+
+
+    def vertex_added(self, vertex):
+        self.populations.add(vertex.population, vertex.code, vertex)
+
+
+    def vertex_removed(self, vertex):
+        self.populations.remove(vertex.population, vertex.code)
+
+
+    def vertex_edited(self, vertex, old_vertex):
+        self.populations.remove(old_vertex['population'], vertex.code)
+        self.populations.add(vertex.population, vertex.code, vertex)
+
+
+    def edge_added(self, edge, replaced_edge):
+        key = (edge.departure.code, edge.destination.code)
+        if replaced_edge is not None:
+            self.distances.remove(replaced_edge.distance, key)
+        self.distances.add(edge.distance, key, edge)
+
+
+    def edge_removed(self, edge):
+        self.distances.remove(edge.distance, (edge.departure.code, edge.destination.code))
@@ -0,0 +1,73 @@
+import math
+
+ACCELERATION = 1406.25 # km/h^2 until cruising speed
+CRUISING_DISTANCE = 400
+CRUISING_SPEED = 750
+
+def leg_rate(leg):
+    """Get the price per km of a leg. Every leg is 0.05 cheaper than the one before.
+
+    Args:
+        leg: Index of the leg in the route, starting at 0.
+
+    Returns:
+        Price per km. None once the discount has used up the price, so the leg is free.
+    """
+    rate = 0.35 - 0.05 * leg
+    if rate >= 0:
+        return rate
+    return None
+
+
+def _count_paid_legs():
+    legs = 0
+    while leg_rate(legs) is not None:
+        legs += 1
+    return legs
+
+# legs from this index on are free
+PAID_LEGS = _count_paid_legs()
+
+def leg_cost(distance, leg):
+    """Calculate the cost of a leg.
+
+    Args:
+        distance: Distance of the leg.
+        leg: Index of the leg in the route, starting at 0.
+
+    Returns:
+        Cost of the leg.
+    """
+    rate = leg_rate(leg)
+    if rate is None:
+        return 0
+    return distance * rate
+
+
+def flight_time(distance):
+    """Calculate the flight time of a leg: accelerating below 400 km, cruising at 750 km/h afterwards.
+
+    Args:
+        distance: Distance of the leg.
+
+    Returns:
+        Flight time in hours.
+    """
+    if distance < CRUISING_DISTANCE:
+        return math.sqrt(2 * distance / ACCELERATION)
+    return CRUISING_DISTANCE / (CRUISING_SPEED / 2) + (distance - CRUISING_DISTANCE) / CRUISING_SPEED
+
+
+def layover_time(vertex):
+    """Calculate the layover time at a vertex: 2 hours minus 10 minutes for every outgoing edge after the first.
+
+    Args:
+        vertex: Vertex object.
+
+    Returns:
+        Layover time in hours.
+    """
+    layover = 2 - (len(vertex.edges) - 1) * 10 / 60
+    if layover > 0:
+        return layover
+    return 0
@@ -1,10 +1,22 @@
+import sys
+import json
+import math
+
+EARTH_RADIUS = 6371
+
 class Vertex(object):
     """Vertex object.
 
-    Vertex object that stores name, population, country, region, code, continent, timezone, coordinates info and edges starting from it.
+    Vertex object that stores name, population, country, region, code, continent, timezone, coordinates info (parsed
+    into numeric latitude and longitude; the structured form is only kept if it cannot be rebuilt from them), edges
+    starting from it and edges ending at it. Attributes are stored in slots and codes are interned to keep large networks compact.
+    The integer id is assigned by the Graph object holding the vertex.
     It also includes a function that stores an edge which starts from it.
 
     """
+    __slots__ = ('name', 'population', 'country', 'region', 'code', 'continent', 'timezone', '_coordinates',
+                 'latitude', 'longitude', 'edges', 'in_edges', 'id')
+
     def __init__(self, metro):
         """Constructor of Vertex object.
 
@@ -13,6 +25,8 @@ class Vertex(object):
         """
         self.edit(metro)
         self.edges = dict()
+        self.in_edges = dict()
+        self.id = None
 
 
     def __lt__(self, other):
@@ -23,23 +37,25 @@ class Vertex(object):
 
 
     def add_edge(self, edge, destination):
-        """Store an edge to the edge dictionart of the current Vertex object.
+        """Store an edge to the edge dictionart of the current Vertex object and to the incoming edge dictionary of the destination.
 
         Args:
             edge: Edge to be added.
             destination: Vertex that is at the destination side of the edge.
         """
         self.edges[destination] = edge
+        destination.in_edges[self] = edge
 
 
     def remove_edge(self, destination):
-        """Remove an edge from the edge dictionart of the current Vertex object.
+        """Remove an edge from the edge dictionart of the current Vertex object and from the incoming edge dictionary of the destination.
 
         Args:
             destination: Vertex that is at the destination side of the edge.
         """
         if destination in self.edges:
             del self.edges[destination]
+            del destination.in_edges[self]
 
 
     def edit(self, metro):
@@ -48,11 +64,132 @@ class Vertex(object):
         """
         self.name = metro['name']
         self.population = metro['population']
-        self.country = metro['country']
+        self.country = sys.intern(metro['country'])
         self.region = metro['region']
-        self.code = metro['code']
-        self.continent = metro['continent']
+        self.code = sys.intern(metro['code'])
+        self.continent = sys.intern(metro['continent'])
         self.timezone = metro['timezone']
-        self.coordinates = str(metro['coordinates'])
+        coordinates = self.structure_coordinates(metro['coordinates'])
+        self.latitude, self.longitude = self.parse_coordinates(coordinates)
+        rebuilt = self.build_coordinates(self.latitude, self.longitude)
+        if (rebuilt is not None and rebuilt == coordinates and list(rebuilt) == list(coordinates) and
+                all(type(value) is int for value in coordinates.values())):
+            self._coordinates = None
+        else:
+            self._coordinates = coordinates
+
+
+    @property
+    def coordinates(self):
+        """Structured coordinates of the Vertex object, e.g. {"N": 40, "W": 88}.
+
+        """
+        if self._coordinates is None:
+            return self.build_coordinates(self.latitude, self.longitude)
+        if isinstance(self._coordinates, dict):
+            return dict(self._coordinates)
+        return self._coordinates
+
+
+    def to_json(self):
+        """Convert the Vertex object to a JSON object holding its info.
+
+        Returns:
+            A JSON object holding vertex info, in the format accepted by the constructor.
+        """
+        metro = dict()
+        metro['code'] = self.code
+        metro['name'] = self.name
+        metro['country'] = self.country
+        metro['continent'] = self.continent
+        metro['timezone'] = self.timezone
+        metro['coordinates'] = self.coordinates
+        metro['population'] = self.population
+        metro['region'] = self.region
+
+        return metro
+
+
+    @staticmethod
+    def structure_coordinates(coordinates):
+        """Convert coordinates to the JSON value they are stored and saved as. Strings of a dict (e.g.
+        "{'N': 40, 'W': 88}") are parsed; other strings are kept.
+
+        Args:
+            coordinates: Dict or string of a dict holding coordinates.
+
+        Returns:
+            Parsed JSON value of the coordinates. The string itself if it cannot be parsed.
+        """
+        if isinstance(coordinates, dict) and all(type(key) is str and key.isalnum() and
+                                                 (type(value) is int or type(value) is float and math.isfinite(value))
+                                                 for key, value in coordinates.items()):
+            # parsing the string of such a dict gives an equal dict
+            return dict(coordinates)
+        try:
+            return json.loads(str(coordinates).replace("\'", "\""))
+        except ValueError:
+            return str(coordinates)
+
+
+    @staticmethod
+    def build_coordinates(latitude, longitude):
+        """Build integer coordinates (e.g. {"N": 40, "W": 88}) from latitude and longitude.
+
+        Args:
+            latitude: Latitude in degrees. North is positive.
+            longitude: Longitude in degrees. East is positive.
+
+        Returns:
+            Dict holding coordinates. None if latitude or longitude is None.
+        """
+        if latitude is None or longitude is None:
+            return None
+        return {('N' if latitude >= 0 else 'S'): int(abs(latitude)), ('E' if longitude >= 0 else 'W'): int(abs(longitude))}
+
+
+    @staticmethod
+    def parse_coordinates(coordinates):
+        """Parse coordinates (e.g. {"N" : 40, "W" : 88}) into numeric latitude and longitude. North and east are positive.
+
+        Args:
+            coordinates: Dict or string of a dict holding coordinates.
+
+        Returns:
+            Latitude and longitude in degrees. Both None if coordinates cannot be parsed.
+        """
+        try:
+            if isinstance(coordinates, str):
+                coordinates = json.loads(coordinates.replace("\'", "\""))
+            latitude = coordinates['N'] if 'N' in coordinates else -coordinates['S']
+            longitude = coordinates['E'] if 'E' in coordinates else -coordinates['W']
+            return float(latitude), float(longitude)
+        except (ValueError, TypeError, KeyError):
+            return None, None
+
+
+    def has_coordinates(self):
+        """Check the Vertex object has numeric coordinates.
+
+        Returns:
+            True if latitude and longitude are known. Otherwise False.
+        """
+        return self.latitude is not None and self.longitude is not None
+
+
+    def great_circle_distance(self, other):
+        """Calculate great-circle distance to another vertex with the haversine formula.
+
+        Args:
+            other: Other Vertex object. Both vertices must have coordinates.
+
+        Returns:
+            Great-circle distance in kilometers.
+        """
+        latitude1 = math.radians(self.latitude)
+        latitude2 = math.radians(other.latitude)
+        a = math.sin((latitude2 - latitude1) / 2) ** 2 + \
+            math.cos(latitude1) * math.cos(latitude2) * math.sin(math.radians(other.longitude - self.longitude) / 2) ** 2
+        return 2 * EARTH_RADIUS * math.asin(min(1, math.sqrt(a)))
 
 
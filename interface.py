@@ -1,7 +1,9 @@
 import webbrowser
-import json
 from graph.graph import Graph
 
+SAVE_DATA = "json/save_data.json"
+SAVE_JOURNAL = "json/save_data.journal"
+
 def main():
     """Main loop of the text-based user interface.
 
@@ -97,7 +99,11 @@ def load_graph(*file_addr):
     """
     graph = Graph()
     for addr in file_addr:
-        graph.load(addr)
+        if addr == SAVE_DATA:
+            graph.load(addr, journal=SAVE_JOURNAL)
+            graph.journal.flush_every = None
+        else:
+            graph.load(addr)
     return graph
 
 
@@ -133,9 +139,9 @@ def print_city_info(graph, code):
     city = graph.vertices[code]
     print_city_Info_helper(city)
     print('Cities reached by single non-stop: ')
-    for neighbor in city.edges.values():
-        print('		', neighbor.destination.name, '(' + neighbor.destination.code + ')', 'distance: ',
-              neighbor.distance)
+    for neighbor, flight in city.edges.items():
+        print('		', neighbor.name, '(' + neighbor.code + ')', 'distance: ',
+              flight.distance)
 
 
 def print_city_Info_helper(city):
@@ -337,14 +343,17 @@ def edit_city(graph, city):
 
 
 def save_network_to_disk(graph):
-    """Convert network graph to a json object and stores it into a file.
+    """Save the network to disk. The first save writes the whole network into a file and starts a change journal next
+    to it; later saves only append the changes made since the previous save to the journal, which is compacted into the
+    file from time to time.
 
     Args:
         graph: Graph object that stores map info.
     """
-    graph_json = graph.convert_to_json()
-    with open("json/save_data.json", 'wt') as out:
-        res = json.dump(graph_json, out, sort_keys=True, indent=4, separators=(',', ': '))
+    if graph.journal is None:
+        graph.enable_journal(SAVE_JOURNAL, SAVE_DATA, flush_every=None)
+    else:
+        graph.journal.flush()
 
 
 def print_route_info(graph, route):
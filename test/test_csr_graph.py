@@ -0,0 +1,64 @@
+import unittest
+import os
+parentdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.sys.path.insert(0, parentdir) 
+
+from graph.graph import Graph
+
+class TestCSRGraph(unittest.TestCase):
+	""" Tests for compressed sparse row snapshots.
+
+	Tests for compressed sparse row snapshots.
+	Tests include testing packed edges, shortest path, hop limited paths and summary queries on the snapshot.
+
+	"""
+	def setUp(self):
+		self.graph = Graph()
+		self.graph.load("../json/test_data.json")
+		self.csr = self.graph.freeze()
+
+
+	def test_packed_edges(self):
+		edges = []
+		for departure, destination, distance in self.csr.iter_edges():
+			edges.append(self.csr.codes[departure] + " -> " + self.csr.codes[destination] + ", " + str(distance))
+		edges.sort()
+		self.assertEqual(edges, ['LIM -> MEX, 24530', 'LIM -> SCL, 2453', 'MEX -> LIM, 24530', 'MEX -> SCL, 4800', 'SCL -> LIM, 2453', 'SCL -> MEX, 4800'])
+		self.assertEqual(len(self.csr), 3)
+		self.assertEqual(self.csr.edge_count(), 6)
+
+
+	def test_summary_queries(self):
+		self.assertEqual(sorted(self.csr.calculate_longest_edge()), [('LIM', 'MEX', 24530), ('MEX', 'LIM', 24530)])
+		self.assertEqual(sorted(self.csr.calculate_shortest_edge()), [('LIM', 'SCL', 2453), ('SCL', 'LIM', 2453)])
+		self.assertEqual(int(self.csr.calculate_average_distance()), 10594)
+		self.assertEqual(self.csr.calculate_biggest_vertex(), "MEX")
+		self.assertEqual(self.csr.calculate_smallest_vertex(), "SCL")
+		self.assertEqual(int(self.csr.calculate_average_vertex_size()), 12816666)
+		self.assertEqual(self.csr.calculate_hub_cities(), ["LIM", "MEX", "SCL"])
+
+
+	def test_shortest_path(self):
+		self.assertEqual(self.csr.calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.csr.calculate_shortest_path(['MEX', 'MEX']), ['MEX'])
+		self.graph.remove_edge("MEX", "SCL")
+		self.assertEqual(self.csr.calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.graph.freeze().calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'LIM'])
+
+
+	def test_hop_limited_paths(self):
+		self.assertEqual(self.csr.calculate_hop_limited_paths(['LIM', 'MEX'], 3), [None, (['LIM', 'MEX'], 24530), (['LIM', 'SCL', 'MEX'], 7253), (['LIM', 'SCL', 'MEX'], 7253)])
+		self.assertEqual(self.csr.calculate_hop_limited_paths(['MEX', 'MEX'], 1), [(['MEX'], 0), (['MEX'], 0)])
+		self.graph.remove_edge("LIM", "MEX")
+		self.assertEqual(self.graph.calculate_hop_limited_paths(['LIM', 'MEX'], 2), [None, None, (['LIM', 'SCL', 'MEX'], 7253)])
+
+
+	def test_batch_shortest_paths(self):
+		pairs = [('MEX', 'LIM'), ('LIM', 'SCL'), ('MEX', 'MEX'), ('SCL', 'MEX'), ('MEX', 'SCL')]
+		expected = [['MEX', 'SCL', 'LIM'], ['LIM', 'SCL'], ['MEX'], ['SCL', 'MEX'], ['MEX', 'SCL']]
+		self.assertEqual(self.graph.calculate_shortest_paths(pairs), expected)
+		self.assertEqual(self.graph.calculate_shortest_paths(pairs, workers=2), expected)
+
+
+if __name__ == '__main__':
+	unittest.main()
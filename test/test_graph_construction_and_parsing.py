@@ -1,9 +1,15 @@
 import unittest
+import io
+import json
 import os
+import tempfile
 parentdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 os.sys.path.insert(0, parentdir) 
 
 from graph.graph import Graph
+from graph.snapshot import GraphSnapshot
+
+city = json.loads('{"code" : "CMI","name" : "Champaign","country" : "US","continent" : "North America","timezone" : -6 ,"coordinates" : {"N" : 40, "W" : 88},"population" : 226000,"region" : 1}')
 
 class TestGraphConstructionAndParsing(unittest.TestCase):
 	""" Tests for graph construction and parsing.
@@ -31,5 +37,138 @@ class TestGraphConstructionAndParsing(unittest.TestCase):
 		self.assertEqual(edges, ['LIM -> MEX, 24530', 'LIM -> SCL, 2453', 'MEX -> LIM, 24530', 'MEX -> SCL, 4800', 'SCL -> LIM, 2453', 'SCL -> MEX, 4800'])
 
 
+	def test_stream_loading(self):
+		graph = Graph()
+		progress = []
+		graph.load_stream("../json/test_data.json", chunk_size=16, progress=lambda read, total: progress.append((read, total)))
+		self.assertEqual(graph.convert_to_json(), self.graph.convert_to_json())
+		self.assertEqual(progress[-1][0], progress[-1][1])
+		graph = Graph()
+		graph.load_stream("../json/map_data.json", chunk_size=256)
+		graph.load_stream("../json/cmi_hub.json", chunk_size=256)
+		expected = Graph()
+		expected.load("../json/map_data.json")
+		expected.load("../json/cmi_hub.json")
+		self.assertEqual(graph.convert_to_json(), expected.convert_to_json())
+		self.assertEqual(graph.get_edge("CMI", "CHI").distance, 132)
+		with tempfile.TemporaryDirectory() as directory:
+			addr = os.path.join(directory, 'routes_first.json')
+			with open(addr, 'w') as out:
+				out.write('{"routes": %s, "metros": %s}' % (json.dumps(self.graph.convert_to_json()['routes']),
+														   json.dumps(self.graph.convert_to_json()['metros'])))
+			graph = Graph()
+			graph.load_stream(addr, chunk_size=16)
+			self.assertEqual(graph.convert_to_json(), self.graph.convert_to_json())
+
+
+	def test_invalid_route_distance(self):
+		data = self.graph.convert_to_json()
+		data['routes'][0]['distance'] = 7000.5
+		with tempfile.TemporaryDirectory() as directory:
+			addr = os.path.join(directory, 'invalid.json')
+			with open(addr, 'w') as out:
+				json.dump(data, out)
+			self.assertRaises(ValueError, Graph().load, addr)
+			self.assertRaises(ValueError, Graph().load_stream, addr)
+
+
+	def test_snapshot_round_trip(self):
+		with tempfile.TemporaryDirectory() as directory:
+			addr = os.path.join(directory, 'test_data.bin')
+			self.graph.save_snapshot(addr)
+			graph = Graph()
+			graph.load_snapshot(addr)
+			self.assertEqual(graph.convert_to_json(), self.graph.convert_to_json())
+			with GraphSnapshot(addr) as snapshot:
+				self.assertEqual(snapshot.codes(), ['LIM', 'MEX', 'SCL'])
+				self.assertEqual(snapshot.vertex_json(1), self.graph.vertices['MEX'].to_json())
+				csr = snapshot.to_csr()
+				self.assertEqual(csr.calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'SCL', 'LIM'])
+				self.assertEqual(csr.calculate_biggest_vertex(), 'MEX')
+				del csr
+
+
+
+	def test_write_json(self):
+		self.graph.add_vertex(dict(city, code="CHI", coordinates='{"N" : 42, "W" : 88}'))
+		self.graph.add_vertex(dict(city, name="Zürich"))
+		self.graph.add_edge("CHI", "CMI", 132)
+		self.assertEqual(self.graph.vertices["CHI"].coordinates, {"N": 42, "W": 88})
+		expected = json.dumps(self.graph.convert_to_json(), sort_keys=True, indent=4, separators=(',', ': '))
+		for chunk_size in (1, 2, 1024):
+			out = io.StringIO()
+			self.graph.write_json(out, chunk_size=chunk_size)
+			self.assertEqual(out.getvalue(), expected)
+		out = io.StringIO()
+		self.graph.write_json(out, sort=False)
+		data = json.loads(out.getvalue())
+		self.assertEqual(sorted(data['metros'], key=lambda metro: metro['code']), self.graph.convert_to_json()['metros'])
+		self.assertEqual(len(data['routes']), 7)
+		out = io.StringIO()
+		Graph().write_json(out, extra_fields={'journal_sequence': 2})
+		self.assertEqual(out.getvalue(), json.dumps({'journal_sequence': 2, 'metros': [], 'routes': []}, indent=4))
+
+	def test_journal(self):
+		with tempfile.TemporaryDirectory() as directory:
+			snapshot = os.path.join(directory, 'save_data.json')
+			addr = os.path.join(directory, 'save_data.journal')
+			journal = self.graph.enable_journal(addr, snapshot, flush_every=2, compact_every=None)
+			self.assertEqual(os.path.getsize(addr), 0)
+			self.graph.add_vertex(city)
+			self.assertEqual((journal.records, len(journal.buffer)), (0, 1))
+			self.graph.add_edge("CMI", "MEX", 3000)
+			self.assertEqual((journal.records, len(journal.buffer)), (2, 0))
+			self.graph.add_edge("MEX", "CMI", 3000)
+			self.graph.remove_edge("LIM", "MEX")
+			with self.graph.batch() as batch:
+				batch.remove_edge("MEX", "LIM")
+				batch.edit_vertex(dict(city, population=1))
+				batch.remove_vertex("SCL")
+			self.assertEqual(len(journal), 5)
+			journal.flush()
+			with open(addr, 'a') as file:
+				file.write('[6, "remove_vertex')
+			graph = Graph()
+			graph.load(snapshot, journal=addr)
+			self.assertEqual(graph.convert_to_json(), self.graph.convert_to_json())
+			self.assertEqual(graph.journal.sequence, 5)
+			self.assertEqual(len(graph.journal), 5)
+			self.assertFalse(open(addr).read().endswith('vertex'))
+			with open(addr) as file:
+				records = file.read()
+			journal.compact()
+			self.assertEqual(os.path.getsize(addr), 0)
+			with open(addr, 'w') as file:
+				file.write(records)
+			graph = Graph()
+			graph.load(snapshot, journal=addr)
+			self.assertEqual(graph.convert_to_json(), self.graph.convert_to_json())
+			graph.add_edge("MEX", "LIM", 100)
+			graph.journal.flush()
+			restored = Graph()
+			restored.load(snapshot, journal=addr)
+			self.assertEqual(restored.get_edge("MEX", "LIM").distance, 100)
+
+
+	def test_journal_compaction_keeps_directed_edges(self):
+		with tempfile.TemporaryDirectory() as directory:
+			snapshot = os.path.join(directory, 'save_data.json')
+			addr = os.path.join(directory, 'save_data.journal')
+			journal = self.graph.enable_journal(addr, snapshot, flush_every=1, compact_every=3)
+			self.graph.add_edge("MEX", "SCL", 1)
+			self.graph.add_edge("LIM", "SCL", 5)
+			self.graph.remove_edge("LIM", "MEX")
+			self.assertEqual(os.path.getsize(addr), 0)
+			edges = sorted((edge.departure.code, edge.destination.code, edge.distance) for edge in self.graph.edges.values())
+			for load in ('load', 'load_stream'):
+				graph = Graph()
+				if load == 'load':
+					graph.load(snapshot, journal=addr)
+				else:
+					graph.load_stream(snapshot)
+				self.assertEqual(sorted((edge.departure.code, edge.destination.code, edge.distance)
+					for edge in graph.edges.values()), edges)
+				self.assertEqual(graph.convert_to_json(), self.graph.convert_to_json())
+
 if __name__ == '__main__':
 	unittest.main()
@@ -1,12 +1,14 @@
 import unittest
 import json
 import os
+import tempfile
 parentdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 os.sys.path.insert(0, parentdir) 
 
 from graph.graph import Graph
 from graph.vertex import Vertex
 from graph.edge import Edge
+from graph.radix_heap import RadixHeap
 
 city = json.loads('{"code" : "CMI","name" : "Champaign","country" : "US","continent" : "North America","timezone" : -6 ,"coordinates" : {"N" : 40, "W" : 88},"population" : 226000,"region" : 1}')
 
@@ -70,6 +72,29 @@ class TestGraphQuery(unittest.TestCase):
 		self.assertTrue("LIM" in cities)
 
 
+	def test_group_index(self):
+		self.graph.enable_group_index()
+		continents_dict = self.graph.calculate_continents_info()
+		self.assertEqual(sorted(city.code for city in continents_dict["South America"]), ["LIM", "SCL"])
+		self.assertEqual([city.code for city in self.graph.calculate_vertices_by('country', 'MX')], ["MEX"])
+		self.assertEqual(self.graph.calculate_population_by('continent'), {"South America": 15050000, "North America": 23400000})
+		self.assertEqual(self.graph.calculate_route_counts_between_continents(), {("South America", "South America"): 2, ("South America", "North America"): 2, ("North America", "South America"): 2})
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertTrue(self.graph.add_edge("CMI", "LIM", 5000))
+		self.assertEqual(self.graph.calculate_population_by('continent')["North America"], 23626000)
+		self.assertEqual(self.graph.calculate_route_counts_between_continents()[("North America", "South America")], 3)
+		moved_city = dict(city)
+		moved_city['continent'] = "South America"
+		moved_city['country'] = "PE"
+		self.assertTrue(self.graph.edit_vertex(moved_city))
+		self.assertEqual(sorted(city.code for city in self.graph.calculate_vertices_by('country', 'PE')), ["CMI", "LIM"])
+		self.assertEqual(self.graph.calculate_route_counts_between_continents()[("South America", "South America")], 3)
+		self.assertTrue(self.graph.remove_vertex("MEX"))
+		self.assertEqual(self.graph.calculate_population_by('continent'), {"South America": 15276000})
+		self.assertEqual(self.graph.calculate_route_counts_between_continents(), {("South America", "South America"): 3})
+		self.assertEqual(list(self.graph.calculate_continents_info().keys()), ["South America"])
+
+
 	def test_hub_cities(self):
 		hub_cities = self.graph.calculate_hub_cities()
 		hub_cities = [hub_cities[0].code, hub_cities[1].code, hub_cities[2].code]
@@ -78,6 +103,48 @@ class TestGraphQuery(unittest.TestCase):
 		self.assertTrue("MEX" in hub_cities)
 
 
+	def test_statistics(self):
+		statistics = self.graph.enable_statistics()
+		self.assertEqual(statistics.edge_count, 6)
+		longest_edge = sorted(self.graph.calculate_longest_edge(), key=lambda x: x.departure.code)
+		self.assertEqual([edge.departure.code for edge in longest_edge], ["LIM", "MEX"])
+		self.assertEqual(int(self.graph.calculate_average_distance()), 10594)
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertEqual(self.graph.calculate_smallest_vertex().code, "CMI")
+		self.assertEqual(int(self.graph.calculate_average_vertex_size()), 9669000)
+		self.assertTrue(self.graph.add_edge("CMI", "MEX", 30000))
+		self.assertEqual([(edge.departure.code, edge.distance) for edge in self.graph.calculate_longest_edge()], [("CMI", 30000)])
+		self.assertTrue(self.graph.add_edge("CMI", "MEX", 2453))
+		self.assertEqual(sorted(edge.departure.code for edge in self.graph.calculate_shortest_edge()), ["CMI", "LIM", "SCL"])
+		self.assertTrue(self.graph.remove_edge("LIM", "SCL"))
+		self.assertEqual(sorted(city.code for city in self.graph.calculate_hub_cities()), ["MEX", "SCL"])
+		edited_city = dict(city)
+		edited_city['population'] = 99000000
+		self.assertTrue(self.graph.edit_vertex(edited_city))
+		self.assertEqual(self.graph.calculate_biggest_vertex().code, "CMI")
+		self.assertTrue(self.graph.remove_vertex("CMI"))
+		self.assertEqual(self.graph.calculate_biggest_vertex().code, "MEX")
+		self.assertEqual(sorted(edge.departure.code for edge in self.graph.calculate_shortest_edge()), ["SCL"])
+
+
+	def test_sorted_index(self):
+		longest_edges = [(edge.departure.code, edge.destination.code) for edge in self.graph.calculate_longest_edges(3)]
+		self.assertEqual(longest_edges, [('MEX', 'LIM'), ('LIM', 'MEX'), ('SCL', 'MEX')])
+		self.assertEqual([edge.distance for edge in self.graph.calculate_shortest_edges(10)], [2453, 2453, 4800, 4800, 24530, 24530])
+		self.assertEqual(len(self.graph.calculate_edges_within(2453, 4800)), 4)
+		self.assertEqual(self.graph.calculate_edges_within(5000, 20000), [])
+		self.assertEqual(self.graph.calculate_distance_percentile(50), 4800)
+		self.assertEqual(self.graph.calculate_distance_percentile(100), 24530)
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertTrue(self.graph.add_edge("CMI", "MEX", 3000))
+		self.assertTrue(self.graph.remove_edge("LIM", "MEX"))
+		self.assertEqual([edge.distance for edge in self.graph.calculate_edges_within(2500, 25000)], [3000, 4800, 4800, 24530])
+		self.assertEqual([city.code for city in self.graph.calculate_smallest_vertices(2)], ['CMI', 'SCL'])
+		self.assertEqual([city.code for city in self.graph.calculate_biggest_vertices(1)], ['MEX'])
+		self.assertEqual([city.code for city in self.graph.calculate_vertices_within(1000000, 10000000)], ['SCL', 'LIM'])
+		self.assertEqual(self.graph.calculate_population_percentile(25), 226000)
+
+
 	def test_map_url(self):
 		url = self.graph.generate_map_url()
 		self.assertTrue("MEX-SCL" in url)
@@ -94,6 +161,8 @@ class TestGraphQuery(unittest.TestCase):
 	def test_add_edge(self):
 		self.assertTrue(self.graph.add_vertex(city))
 		self.assertFalse(self.graph.add_edge("CMI", "PAR", 30000))
+		self.assertFalse(self.graph.add_edge("CMI", "MEX", 30000.5))
+		self.assertFalse(self.graph.add_edge("CMI", "MEX", -1))
 		self.assertTrue(self.graph.add_edge("CMI", "MEX", 30000))
 		edges = []
 		for edge in self.graph.edges.values():
@@ -127,12 +196,51 @@ class TestGraphQuery(unittest.TestCase):
 		self.assertEqual(edges, ['LIM -> MEX, 24530', 'LIM -> SCL, 2453', 'MEX -> LIM, 24530', 'MEX -> SCL, 4800', 'SCL -> LIM, 2453', 'SCL -> MEX, 4800'])
 
 
+	def test_remove_vertices(self):
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertTrue(self.graph.add_edge("CMI", "MEX", 30000))
+		self.assertTrue(self.graph.add_edge("SCL", "CMI", 1000))
+		self.assertTrue(self.graph.add_edge("CMI", "CMI", 0))
+		self.assertFalse(self.graph.remove_vertices(["CMI", "PAR"]))
+		self.assertTrue("CMI" in self.graph.vertices.keys())
+		self.assertTrue(self.graph.remove_vertices(["CMI", "LIM", "CMI"]))
+		self.assertEqual(sorted(self.graph.vertices.keys()), ["MEX", "SCL"])
+		edges = []
+		for edge in self.graph.edges.values():
+			edges.append(edge.departure.code + " -> " + edge.destination.code + ", " + str(edge.distance))
+		edges.sort()
+		self.assertEqual(edges, ['MEX -> SCL, 4800', 'SCL -> MEX, 4800'])
+		self.assertEqual(list(self.graph.vertices["MEX"].in_edges.keys()), [self.graph.vertices["SCL"]])
+
+
 	def test_save_to_disk(self):
 		test_string = '{"metros": [{"code": "LIM", "continent": "South America", "coordinates": {"S": 12, "W": 77}, "country": "PE", "name": "Lima", "population": 9050000, "region": 1, "timezone": -5}, {"code": "MEX", "continent": "North America", "coordinates": {"N": 19, "W": 99}, "country": "MX", "name": "Mexico City", "population": 23400000, "region": 1, "timezone": -6}, {"code": "SCL", "continent": "South America", "coordinates": {"S": 33, "W": 71}, "country": "CL", "name": "Santiago", "population": 6000000, "region": 1, "timezone": -4}], "routes": [{"distance": 24530, "ports": ["LIM", "MEX"]}, {"distance": 2453, "ports": ["LIM", "SCL"]}, {"distance": 24530, "ports": ["MEX", "LIM"]}, {"distance": 4800, "ports": ["MEX", "SCL"]}, {"distance": 2453, "ports": ["SCL", "LIM"]}, {"distance": 4800, "ports": ["SCL", "MEX"]}]}'
 		json_string = json.dumps(self.graph.convert_to_json(), sort_keys=True)
 		self.assertEqual(json_string, test_string)
 
 
+	def test_symmetric_storage(self):
+		graph = Graph(symmetric=True)
+		graph.load("../json/test_data.json")
+		self.assertEqual(len(graph.edges.routes), 3)
+		self.assertEqual(len(graph.edges), 6)
+		self.assertEqual(graph.convert_to_json(), self.graph.convert_to_json())
+		longest_edge = sorted((edge.departure.code, edge.destination.code) for edge in graph.calculate_longest_edge())
+		self.assertEqual(longest_edge, [('LIM', 'MEX'), ('MEX', 'LIM')])
+		self.assertEqual(int(graph.calculate_average_distance()), 10594)
+		self.assertTrue("SCL-LIM" in graph.generate_map_url())
+		self.assertTrue(graph.remove_edge("MEX", "SCL"))
+		self.assertFalse(graph.remove_edge("MEX", "SCL"))
+		self.assertEqual(len(graph.edges.routes), 3)
+		self.assertEqual(graph.get_edge("SCL", "MEX").distance, 4800)
+		self.assertEqual(graph.calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'LIM'])
+		self.assertEqual(graph.calculate_shortest_path(['LIM', 'MEX']), ['LIM', 'SCL', 'MEX'])
+		self.assertTrue(graph.remove_edge("SCL", "MEX"))
+		self.assertEqual(len(graph.edges.routes), 2)
+		self.assertTrue(graph.add_edge("SCL", "LIM", 2000))
+		self.assertEqual(graph.get_edge("LIM", "SCL").distance, 2000)
+
+
 	def test_route_info(self):
 		route = ['MEX', 'SCL', 'LIM']
 		self.assertTrue(self.graph.is_valid_route(route))
@@ -143,6 +251,92 @@ class TestGraphQuery(unittest.TestCase):
 		self.assertFalse(self.graph.is_valid_route(route))
 
 
+	def test_cheapest_and_fastest_route(self):
+		self.assertEqual(self.graph.calculate_cheapest_route(['LIM', 'MEX']), ['LIM', 'SCL', 'MEX'])
+		self.assertEqual(self.graph.calculate_fastest_route(['LIM', 'MEX']), ['LIM', 'SCL', 'MEX'])
+		self.assertEqual(self.graph.calculate_fastest_route(['MEX', 'MEX']), ['MEX'])
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertTrue(self.graph.add_edge("LIM", "CMI", 100))
+		self.assertTrue(self.graph.add_edge("CMI", "LIM", 100))
+		self.assertTrue(self.graph.add_edge("CMI", "MEX", 100))
+		route = self.graph.calculate_cheapest_route(['LIM', 'MEX'])
+		self.assertEqual(route, ['LIM', 'CMI', 'MEX'])
+		self.assertEqual(self.graph.calculate_cheapest_route(['CMI', 'SCL']), ['CMI', 'LIM', 'SCL'])
+		for cities in (['LIM', 'MEX'], ['CMI', 'SCL'], ['MEX', 'CMI']):
+			route = self.graph.calculate_cheapest_route(cities)
+			self.assertEqual(len(set(route)), len(route))
+			cheapest = min(self.graph.calculate_pareto_routes(cities, max_labels=None), key=lambda route: route[2])
+			self.assertEqual(self.graph.calculate_route_info(route)[0], cheapest[2])
+		self.assertTrue(self.graph.remove_edge("CMI", "MEX"))
+		self.assertEqual(self.graph.calculate_fastest_route(['LIM', 'MEX']), ['LIM', 'SCL', 'MEX'])
+		self.assertEqual(self.graph.calculate_fastest_route(['MEX', 'CMI']), ['MEX', 'SCL', 'LIM', 'CMI'])
+		self.graph.remove_edge("SCL", "MEX")
+		self.assertEqual(self.graph.calculate_fastest_route(['LIM', 'MEX']), ['LIM', 'MEX'])
+		self.graph.remove_edge("LIM", "MEX")
+		self.assertEqual(self.graph.calculate_cheapest_route(['SCL', 'MEX']), None)
+
+
+	def test_pareto_routes(self):
+		routes = self.graph.calculate_pareto_routes(['LIM', 'MEX'])
+		self.assertEqual(routes, [(['LIM', 'SCL', 'MEX'], 7253, 2298.55, 12.57, 2), (['LIM', 'MEX'], 24530, 8585.5, 33.24, 1)])
+		for route, distance, cost, time, hops in routes:
+			self.assertEqual(self.graph.calculate_route_info(route), (cost, time))
+		self.assertEqual(self.graph.calculate_pareto_routes(['LIM', 'LIM']), [(['LIM'], 0, 0.0, 0.0, 0)])
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertEqual(self.graph.calculate_pareto_routes(['LIM', 'CMI']), [])
+		self.assertTrue(self.graph.add_edge("LIM", "CMI", 300))
+		self.assertTrue(self.graph.add_edge("CMI", "MEX", 1000))
+		routes = self.graph.calculate_pareto_routes(['LIM', 'MEX'])
+		self.assertEqual([route[0] for route in routes], [['LIM', 'CMI', 'MEX'], ['LIM', 'MEX']])
+		self.assertEqual(len(self.graph.calculate_pareto_routes(['LIM', 'MEX'], max_labels=1)), 1)
+
+
+	def test_k_shortest_paths(self):
+		self.assertEqual(self.graph.calculate_k_shortest_paths(['MEX', 'LIM'], 5), [(['MEX', 'SCL', 'LIM'], 7253), (['MEX', 'LIM'], 24530)])
+		self.assertEqual(self.graph.calculate_k_shortest_paths(['MEX', 'LIM'], 1), [(['MEX', 'SCL', 'LIM'], 7253)])
+		self.assertEqual(self.graph.calculate_k_shortest_paths(['LIM', 'LIM'], 2), [(['LIM'], 0)])
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertEqual(self.graph.calculate_k_shortest_paths(['MEX', 'CMI'], 3), [])
+		self.assertTrue(self.graph.add_edge("MEX", "CMI", 100))
+		self.assertTrue(self.graph.add_edge("CMI", "LIM", 3000))
+		version = self.graph.version
+		paths = self.graph.calculate_k_shortest_paths(['MEX', 'LIM'], 3)
+		self.assertEqual(paths, [(['MEX', 'CMI', 'LIM'], 3100), (['MEX', 'SCL', 'LIM'], 7253), (['MEX', 'LIM'], 24530)])
+		self.assertEqual(self.graph.version, version)
+
+
+	def test_reachable_cities(self):
+		reachable = self.graph.calculate_reachable_cities('LIM', 12.6)
+		self.assertEqual(sorted(reachable), ['LIM', 'MEX', 'SCL'])
+		self.assertEqual(round(reachable['MEX'], 2), self.graph.calculate_route_info(['LIM', 'SCL', 'MEX'])[1])
+		self.assertEqual(sorted(self.graph.calculate_reachable_cities('LIM', 8)), ['LIM', 'SCL'])
+		self.assertEqual(self.graph.calculate_reachable_cities('LIM', 7253, 'distance'), {'LIM': 0, 'SCL': 2453, 'MEX': 7253})
+		reachable = self.graph.calculate_reachable_cities_from(['LIM', 'MEX'], 5000, 'distance')
+		self.assertEqual(reachable, {'LIM': {'LIM': 0, 'SCL': 2453}, 'MEX': {'MEX': 0, 'SCL': 4800}})
+		self.assertRaises(ValueError, self.graph.calculate_reachable_cities, 'LIM', 10, 'cost')
+
+
+	def test_connectivity_index(self):
+		self.assertEqual(self.graph.calculate_components(), [['LIM', 'MEX', 'SCL']])
+		connectivity = self.graph.connectivity
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertFalse(connectivity.may_reach(self.graph.vertices["MEX"], self.graph.vertices["CMI"]))
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'CMI']), None)
+		self.assertTrue(self.graph.add_edge("CMI", "MEX", 3000))
+		self.assertTrue(connectivity.may_reach(self.graph.vertices["MEX"], self.graph.vertices["CMI"]))
+		self.assertFalse(connectivity.strongly_connected(self.graph.vertices["MEX"], self.graph.vertices["CMI"]))
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'CMI']), None)
+		self.assertEqual(self.graph.calculate_shortest_path(['CMI', 'LIM']), ['CMI', 'MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.graph.calculate_components(), [['LIM', 'MEX', 'SCL'], ['CMI']])
+		self.assertTrue(self.graph.add_edge("LIM", "CMI", 3000))
+		self.assertEqual(self.graph.calculate_components(), [['CMI', 'LIM', 'MEX', 'SCL']])
+		self.assertTrue(self.graph.remove_edge("CMI", "MEX"))
+		self.assertTrue(self.graph.remove_edge("LIM", "CMI"))
+		self.assertEqual(self.graph.calculate_shortest_path(['LIM', 'CMI'], method='bidirectional'), None)
+		self.assertEqual(self.graph.calculate_components(), [['LIM', 'MEX', 'SCL'], ['CMI']])
+		self.assertRaises(ValueError, self.graph.calculate_shortest_path, ['LIM', 'CMI'], 'unknown')
+
+
 	def test_shortest_path(self):
 		shortest_path = ['MEX', 'SCL', 'LIM']
 		route = self.graph.calculate_shortest_path(['MEX', 'LIM'])
@@ -150,6 +344,145 @@ class TestGraphQuery(unittest.TestCase):
 		self.assertTrue(self.graph.add_vertex(city))
 		route = self.graph.calculate_shortest_path(['MEX', 'CMI'])
 		self.assertEqual(route, None)
+
+
+	def test_result_cache(self):
+		cache = self.graph.enable_result_cache(size=2)
+		route = self.graph.calculate_shortest_path(['MEX', 'LIM'])
+		self.assertEqual(route, ['MEX', 'SCL', 'LIM'])
+		route.append('MEX')
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.graph.calculate_route_info(['MEX', 'SCL', 'LIM']), (2415.90, 12.57))
+		self.assertEqual(self.graph.calculate_route_info(['MEX', 'SCL', 'LIM']), (2415.90, 12.57))
+		self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 2, 0))
+		self.assertEqual(self.graph.calculate_shortest_path(['LIM', 'MEX']), ['LIM', 'SCL', 'MEX'])
+		self.assertEqual(cache.evictions, 1)
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(cache.counters(), {'hits': 2, 'misses': 4, 'evictions': 2, 'invalidations': 0, 'size': 2})
+		self.graph.remove_edge("MEX", "SCL")
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'LIM'])
+		self.assertEqual((cache.misses, cache.invalidations, len(cache)), (5, 1, 1))
+		self.assertRaises(KeyError, self.graph.calculate_route_info, ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(len(cache), 1)
+
+
+	def test_batch(self):
+		self.graph.enable_sorted_index()
+		self.graph.enable_connectivity_index()
+		with self.graph.batch() as batch:
+			batch.add_vertex(city)
+			batch.add_edge("CMI", "MEX", 3000)
+			batch.add_edge("MEX", "CMI", 3000)
+			batch.remove_edge("LIM", "MEX")
+			batch.remove_edge("MEX", "LIM")
+			self.assertFalse("CMI" in self.graph.vertices)
+		self.assertEqual(self.graph.calculate_longest_edges(1)[0].distance, 4800)
+		self.assertEqual(self.graph.calculate_shortest_path(['CMI', 'LIM']), ['CMI', 'MEX', 'SCL', 'LIM'])
+		saved = self.graph.convert_to_json()
+		batch = self.graph.batch()
+		batch.remove_vertex("CMI")
+		batch.add_edge("CMI", "LIM", 10)
+		batch.remove_edge("MEX", "CMI")
+		batch.edit_vertex({"code": "XXX"})
+		with self.assertRaises(ValueError) as context:
+			batch.commit()
+		self.assertEqual(str(context.exception).count(': city'), 2)
+		self.assertEqual(str(context.exception).count(': flight'), 1)
+		with self.assertRaises(ValueError) as context:
+			with self.graph.batch() as batch:
+				batch.add_edge("MEX", "LIM", 1)
+				batch.edit_vertex({"code": "MEX", "name": "Renamed"})
+				batch.add_edge("MEX", "SCL", -1)
+		self.assertTrue('no country, continent, timezone, coordinates, population, region' in str(context.exception))
+		self.assertTrue('invalid distance -1' in str(context.exception))
+		batch = self.graph.batch()
+		batch.add_edge("MEX", "LIM", 7000.5)
+		batch.add_edge("MEX", "SCL", True)
+		self.assertEqual(batch.validate(), ['0 add_edge MEX-LIM: invalid distance 7000.5',
+											'1 add_edge MEX-SCL: invalid distance True'])
+		with self.assertRaises(TypeError):
+			with self.graph.batch() as batch:
+				batch.remove_vertex("CMI")
+				batch.add_edge("MEX", "LIM", 1)
+				batch.edit_vertex(dict(self.graph.vertices["MEX"].to_json(), name="Renamed", country=None))
+		self.assertEqual(self.graph.convert_to_json(), saved)
+		self.assertEqual(self.graph.vertices["MEX"].name, "Mexico City")
+		self.assertEqual(self.graph.calculate_shortest_path(['LIM', 'CMI']), ['LIM', 'SCL', 'MEX', 'CMI'])
+		self.assertEqual(self.graph.calculate_shortest_edges(1)[0].distance, 2453)
+
+
+	def test_radix_heap(self):
+		pq = RadixHeap({"MEX": 7, "LIM": 3})
+		pq["SCL"] = 5
+		pq["MEX"] = 4
+		self.assertEqual(pq.smallest(), "LIM")
+		self.assertEqual(list(pq.sorted_iter()), ["LIM", "MEX", "SCL"])
+		self.assertRaises(IndexError, pq.pop_smallest)
+		pq["MEX"] = 10
+		self.assertEqual(pq.pop_smallest(), "MEX")
+		self.assertRaises(ValueError, pq.__setitem__, "LIM", 9)
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'LIM'], queue=RadixHeap), ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'LIM'], 'bidirectional', RadixHeap), ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.graph.calculate_k_shortest_paths(['MEX', 'LIM'], 2, RadixHeap), [(['MEX', 'SCL', 'LIM'], 7253), (['MEX', 'LIM'], 24530)])
+
+
+	def test_bidirectional_shortest_path(self):
+		route = self.graph.calculate_shortest_path(['MEX', 'LIM'], method='bidirectional')
+		self.assertEqual(route, ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'MEX'], method='bidirectional'), ['MEX'])
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertTrue(self.graph.add_edge("CMI", "MEX", 30000))
+		self.assertEqual(self.graph.calculate_shortest_path(['CMI', 'LIM'], method='bidirectional'), ['CMI', 'MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'CMI'], method='bidirectional'), None)
+		self.assertTrue(self.graph.remove_vertex("MEX"))
+		self.assertEqual(self.graph.calculate_shortest_path(['CMI', 'LIM'], method='bidirectional'), None)
+		self.assertRaises(ValueError, self.graph.calculate_shortest_path, ['LIM', 'SCL'], 'unknown')
+
+
+	def test_astar_shortest_path(self):
+		self.assertEqual(self.graph.vertices["LIM"].latitude, -12)
+		self.assertEqual(self.graph.vertices["LIM"].longitude, -77)
+		scale = self.graph.calculate_heuristic_scale()
+		self.assertTrue(0 < scale <= 1)
+		for edge in self.graph.edges.values():
+			self.assertTrue(scale * edge.departure.great_circle_distance(edge.destination) <= edge.distance)
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'LIM'], method='astar'), ['MEX', 'SCL', 'LIM'])
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertEqual(self.graph.vertices["CMI"].latitude, 40)
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'CMI'], method='astar'), None)
+
+
+	def test_contraction_hierarchy_shortest_path(self):
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'LIM'], method='ch'), ['MEX', 'SCL', 'LIM'])
+		self.assertEqual(self.graph.calculate_shortest_path(['LIM', 'MEX'], method='ch'), ['LIM', 'SCL', 'MEX'])
+		self.assertTrue(self.graph.remove_edge("SCL", "MEX"))
+		self.assertEqual(self.graph.calculate_shortest_path(['LIM', 'MEX'], method='ch'), ['LIM', 'MEX'])
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'CMI'], method='ch'), None)
+		with tempfile.TemporaryDirectory() as directory:
+			addr = os.path.join(directory, 'test_data.ch.json')
+			hierarchy = self.graph.build_contraction_hierarchy(addr)
+			self.assertTrue(os.path.exists(addr))
+			loaded = self.graph.build_contraction_hierarchy(addr)
+			self.assertEqual(loaded.fingerprint, hierarchy.fingerprint)
+			self.assertEqual(loaded.calculate_shortest_path(['MEX', 'LIM']), ['MEX', 'SCL', 'LIM'])
+
+
+	def test_distance_matrix(self):
+		distance_matrix = self.graph.enable_distance_matrix()
+		self.assertEqual(self.graph.calculate_distance(['MEX', 'LIM']), 7253)
+		self.assertIs(type(self.graph.calculate_distance(['MEX', 'LIM'])), int)
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'LIM'], method='matrix'), ['MEX', 'SCL', 'LIM'])
+		self.assertTrue(self.graph.add_vertex(city))
+		self.assertTrue(distance_matrix.valid)
+		self.assertEqual(self.graph.calculate_distance(['MEX', 'CMI']), None)
+		self.assertTrue(self.graph.add_edge("LIM", "CMI", 100))
+		self.assertTrue(distance_matrix.valid)
+		self.assertEqual(self.graph.calculate_shortest_path(['MEX', 'CMI'], method='matrix'), ['MEX', 'SCL', 'LIM', 'CMI'])
+		self.assertTrue(self.graph.remove_edge("MEX", "SCL"))
+		self.assertFalse(distance_matrix.valid)
+		self.assertEqual(self.graph.calculate_distance(['MEX', 'CMI']), 24630)
+		self.assertTrue(distance_matrix.valid)
 		
 
 if __name__ == '__main__':
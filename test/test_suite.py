@@ -1,11 +1,13 @@
 import unittest
 from test_graph_query import TestGraphQuery
 from test_graph_construction_and_parsing import TestGraphConstructionAndParsing
+from test_csr_graph import TestCSRGraph
 
 def suite():
 	test_suite = unittest.TestSuite()
 	test_suite.addTest(unittest.makeSuite(TestGraphConstructionAndParsing))
 	test_suite.addTest(unittest.makeSuite(TestGraphQuery))
+	test_suite.addTest(unittest.makeSuite(TestCSRGraph))
 	return test_suite
 
 if __name__ == '__main__':